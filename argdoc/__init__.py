@@ -1,2 +1,5 @@
 from .version import __version__
 from .argdoc import ArgDoc
+from .formatters import Formatter, register_formatter
+from .record import DocRecord
+from .registry import ParamSpec
@@ -0,0 +1,62 @@
+'''
+Rendering of type annotations for :py:class:`.ArgDoc` instances created with
+`annotations=True`.  This module is only imported when annotations are used.
+'''
+import re
+from collections import OrderedDict
+
+# The number of annotations kept by each of the caches below; the oldest are dropped first
+MAXSIZE = 1024
+
+# Rendered annotations keyed by the annotation objects, so that each distinct annotation is
+# only rendered once however many functions use it
+_RENDERED = OrderedDict()
+
+# The same rendered annotations keyed by the ids of the annotation objects (which are kept
+# alive so the ids aren't reused).  Typing constructs are slow to hash and the same objects are
+# usually shared by many functions, so they are looked up by identity first.
+_BY_ID = OrderedDict()
+
+_QUALIFIERS = re.compile(r'\b(?:typing|typing_extensions|collections\.abc|builtins)\.')
+_FORWARD_REFS = re.compile(r"ForwardRef\('([^']*)'(?:, module='[^']*')?\)")
+
+
+def format_annotation(annotation):
+    '''
+    Return the type of a parameter annotated with `annotation` as it appears in docstrings.
+    '''
+    entry = _BY_ID.get(id(annotation))
+    if entry is not None and entry[0] is annotation:
+        return entry[1]
+    try:
+        text = _RENDERED.get(annotation)
+        if text is None:
+            text = _remember(_RENDERED, annotation, _format(annotation))
+    except TypeError:
+        # Unhashable annotations can't be cached
+        return _format(annotation)
+    _remember(_BY_ID, id(annotation), (annotation, text))
+    return text
+
+
+def _remember(entries, key, value):
+    entries[key] = value
+    if len(entries) > MAXSIZE:
+        # Drop the oldest entry.  popitem is atomic, so threads can't interfere with it
+        entries.popitem(last=False)
+    return value
+
+
+def _format(annotation):
+    if isinstance(annotation, str):
+        # String and postponed (PEP 563) annotations are documented as written, so they never
+        # need to be evaluated
+        return annotation
+    if annotation is None or annotation is type(None):
+        return 'None'
+    if annotation is Ellipsis:
+        return '...'
+    if isinstance(annotation, type) and not hasattr(annotation, '__origin__'):
+        return annotation.__qualname__
+    # Generic aliases, unions, and other typing constructs
+    return _FORWARD_REFS.sub(r'\1', _QUALIFIERS.sub('', repr(annotation)))
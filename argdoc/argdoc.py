@@ -1,17 +1,21 @@
-from __future__ import division, print_function, unicode_literals
-from builtins import super
-
 import sys
-import pkg_resources
-from inspect import getdoc
-try:
-    from inspect import signature, _empty
-    from inspect import Parameter
-except ImportError:
-    from funcsigs import signature, _empty
-    from funcsigs import Parameter
+from _thread import RLock
+from collections import ChainMap
+from functools import partial
+from time import perf_counter
+from types import FunctionType
+from weakref import WeakKeyDictionary, WeakSet
+from inspect import cleandoc, unwrap
+from inspect import _empty, CO_VARARGS, CO_VARKEYWORDS
+from inspect import Parameter
 
-from IPython import embed as shell
+from .cache import DocstringTable, FragmentCache
+from .defaults import DefaultRenderer
+from .formatters import get_formatter
+from .index import UsageIndex
+from .record import Argument, DocRecord, Keyword
+from .registry import ParamSpec, Registry
+from .signatures import signature
 
 POSITIONAL_ONLY = Parameter.POSITIONAL_ONLY
 POSITIONAL_OR_KEYWORD = Parameter.POSITIONAL_OR_KEYWORD
@@ -21,9 +25,175 @@ VAR_KEYWORD = Parameter.VAR_KEYWORD
 
 POSITIONALS = [POSITIONAL_ONLY, POSITIONAL_OR_KEYWORD, VAR_POSITIONAL]
 
+# Private methods that are documented by :py:meth:`.ArgDoc.document_class`
+SPECIAL_METHODS = ['__init__', '__new__', '__call__']
+
+# Objects tagged by `sphinx_only` instances, mapped to the instance that tagged them and the
+# errors that they raise
+_SPHINX_TAGGED = WeakKeyDictionary()
+
+# Every ArgDoc instance, so that objects documented by any of them can be recognized
+_INSTANCES = WeakSet()
+
+
+def documenter_for(obj):
+    '''
+    Return a decorator of the :py:class:`.ArgDoc` instance that tagged `obj` for rendering by
+    the :py:mod:`argdoc.sphinx` extension, using the arguments registered now, or `None` if
+    `obj` was not tagged.
+    '''
+    try:
+        tagged = _SPHINX_TAGGED.get(obj)
+    except TypeError:
+        return None
+    if tagged is None:
+        return None
+    arg_doc, raises = tagged
+    return arg_doc(raises)
+
+
+def _code_signature(func):
+    '''
+    Return everything about the parameters of the function `func` that affects its
+    documentation, read from its code object, which is much cheaper than inspecting its
+    signature.
+    '''
+    code = func.__code__
+    nparams = (code.co_argcount + code.co_kwonlyargcount
+               + bool(code.co_flags & CO_VARARGS) + bool(code.co_flags & CO_VARKEYWORDS))
+    return (code.co_posonlyargcount, code.co_argcount, code.co_kwonlyargcount,
+            code.co_flags & (CO_VARARGS | CO_VARKEYWORDS), code.co_varnames[:nparams],
+            func.__defaults__, func.__kwdefaults__)
+
+
+def _parameter_names(obj):
+    '''
+    Return the names of the parameters of `obj`.  The names of functions are read from their
+    code objects, which is much cheaper than inspecting their signatures, and may include
+    parameters that aren't documented (e.g. the first argument of `__new__`).
+    '''
+    obj = getattr(obj, '__func__', obj)
+    if isinstance(obj, type):
+        funcs = [vars(cls)[name] for cls in obj.__mro__[:-1] for name in ('__init__', '__new__')
+                 if name in vars(cls)]
+    else:
+        funcs = [obj]
+    names = []
+    for func in funcs:
+        func = unwrap(getattr(func, '__func__', func))
+        if isinstance(func, FunctionType):
+            names.extend(_code_signature(func)[4])
+        else:
+            try:
+                names.extend(signature(func).parameters)
+            except (TypeError, ValueError):
+                pass
+    return names
+
+
+def record_of(obj):
+    '''
+    Return the :py:class:`.DocRecord` attached to `obj` by :py:meth:`.ArgDoc.record`, or
+    `None` if `obj` has no record yet.
+    '''
+    obj = getattr(obj, '__func__', obj)
+    if type(obj) is FunctionType:
+        # Reading the __dict__ of a function would give it one
+        return getattr(obj, '__argdoc__', None)
+    try:
+        return vars(obj).get('__argdoc__')
+    except TypeError:
+        return None
+
+
+def _set_record(target, record):
+    '''
+    Attach `record` to `target` as its `__argdoc__` attribute, if `target` has attributes.
+    '''
+    try:
+        target.__argdoc__ = record
+    except (AttributeError, TypeError):
+        pass
+
+
+def _drop_record(target):
+    '''
+    Remove the record attached to `target`, which is stale once `target` is documented again.
+    '''
+    if record_of(target) is not None:
+        try:
+            del target.__argdoc__
+        except (AttributeError, TypeError):
+            pass
+
 __metaclass__ = type
 
 
+class _LazyDoc(str):
+    '''
+    A stand-in docstring used by lazy :py:class:`.ArgDoc` instances.
+
+    The string value of a :py:class:`._LazyDoc` is the original, undecorated docstring.
+    The first time one of its Python-level methods is used (it is printed, converted with
+    :py:func:`str`, cleaned by :py:func:`inspect.getdoc`, compared, split, etc.) the full
+    docstring is rendered by calling `render` and the result is cached and used from then on.
+
+    Code implemented in C that reads the characters of a :py:class:`str` directly doesn't
+    call any of those methods, so it sees the original docstring (e.g. :py:meth:`str.join`,
+    :py:mod:`re`, :py:func:`json.dumps`, :py:meth:`io.StringIO.write`, and
+    :py:func:`textwrap.dedent`, which argparse uses for descriptions).  Pass `str(doc)` to
+    such code or render the docstrings first with :py:meth:`.ArgDoc.render_pending`.
+    '''
+    def __new__(cls, original, render):
+        obj = super().__new__(cls, original or '')
+        obj._render = render
+        obj._rendered = None
+        return obj
+
+    def __str__(self):
+        rendered = self._rendered
+        if rendered is None:
+            # Read _render once, since another thread may clear it once it has rendered
+            render = self._render
+            if render is None:
+                return self._rendered
+            rendered = self._rendered = render()
+            self._render = None
+        return rendered
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __radd__(self, other):
+        return other + str(self)
+
+    def __rmod__(self, other):
+        return other % str(self)
+
+    def __reduce__(self):
+        return (str, (str(self),))
+
+
+def _lazy_method(name):
+    def method(self, *args, **kwargs):
+        return getattr(str(self), name)(*args, **kwargs)
+    method.__name__ = name
+    return method
+
+
+for _name in dir(str):
+    if _name.startswith('_') and _name not in ('__add__', '__contains__', '__eq__', '__format__',
+                                               '__ge__', '__getitem__', '__gt__', '__iter__',
+                                               '__le__', '__len__', '__lt__', '__mod__',
+                                               '__mul__', '__ne__', '__rmul__'):
+        continue
+    setattr(_LazyDoc, _name, _lazy_method(_name))
+del _name
+
+
 class ArgDoc:
     '''
     This decorator inspects the argspec of a decorated function, method, or class and
@@ -35,184 +205,1005 @@ class ArgDoc:
     the decorator prior to use.  This is done through two methods: `.ArgDoc.register_argument`
     and `.ArgDoc.register_keyword`.
 
-    At present, this only produces Numpy and Google style docstrings, but can easily be
-    extended to output other docstring formats.
+    Numpy, Google, Sphinx (reST field list), and Epytext style docstrings are available
+    through `form`.  Other styles can be added by registering a :py:class:`.Formatter` with
+    :py:func:`.register_formatter` or by passing a :py:class:`.Formatter` as `form`.
+
+    If `lazy` is `True`, decorating an object only records the object and the registered
+    arguments.  The docstring is rendered the first time it is used through a Python-level
+    string method (e.g. by :py:func:`help`, :py:func:`inspect.getdoc`, :py:func:`str`, or
+    Sphinx) and is cached afterwards.  Code implemented in C that reads strings directly
+    (e.g. :py:meth:`str.join`, :py:mod:`re`, :py:func:`json.dumps`, and
+    :py:func:`textwrap.dedent`) sees the original docstring instead; call
+    :py:meth:`.ArgDoc.render_pending` to render every pending docstring up front.  Note that
+    errors caused by unregistered or misordered arguments are also deferred until rendering.
+
+    When python is run with `-OO`, docstrings are stripped and decorating is a no-op.
+
+    Rendered parameter entries are cached and reused by later decorated objects that share
+    the same parameters.  At most `cache_size` entries are kept; use :py:meth:`.cache_info`
+    to inspect the cache.  Identical docstrings (e.g. from overloads or from methods of sibling
+    classes) are interned so that all of the decorated objects share a single copy; at most
+    `cache_size` docstrings are kept for this.
+
+    If `cache_dir` is given, rendered docstrings of functions are also stored in a cache file
+    in that directory and are reused by later processes for as long as the function, its
+    docstring, the relevant registered arguments, and the form are unchanged.
+
+    If `parent` is another :py:class:`.ArgDoc` instance, arguments that are not registered with
+    this instance are looked up in `parent` (and its parents) without being copied, so
+    arguments registered with `parent` later on are also available here.  Arguments registered
+    with this instance override those of the same name in `parent`, and the arguments ignored
+    by `parent` are also ignored by this instance.
+
+    If `instrument` is `True` or a `stats_hook` is given, the time spent inspecting signatures
+    and rendering docstrings is recorded and can be retrieved with :py:meth:`.ArgDoc.stats`.
+    `stats_hook` is called with the timings of each rendered docstring.
+
+    If `sphinx_only` is `True`, decorating an object only tags it and its docstring is left
+    untouched at runtime.  The parameters are instead added to the documentation by the
+    :py:mod:`argdoc.sphinx` extension when the Sphinx documentation is built.
+
+    Arguments can be registered and objects decorated from several threads at once.  Each
+    decorator uses a snapshot of the registered arguments taken when it is created (e.g. by
+    `arg_doc()`), and snapshots are never modified, so decorators don't need to lock.
+
+    Default values are shown as :py:func:`str` would show them, but values longer than
+    `max_default_length` characters are truncated.  Large containers and arrays are never
+    converted to strings in full.  If `default_time_budget` is given, values of types that take
+    longer than `default_time_budget` seconds to convert are shown by their type alone
+    afterwards.  This makes docstrings depend on timing, so it is off by default.
+
+    If `annotations` is `True`, the type of each parameter that has a type annotation is
+    taken from the annotation rather than from the registry.  Each distinct annotation is
+    rendered once and reused; string and postponed annotations are documented as written.
+
+    Decorated objects are indexed by the names of their parameters.  When an argument is
+    registered again (e.g. with `force=True`), only the docstrings of the objects that use it,
+    including those decorated by instances inheriting from this one, are rendered again.  The
+    index can be queried with :py:meth:`.ArgDoc.users_of` and :py:meth:`.ArgDoc.unused`.  It
+    is built the first time it is needed (when an argument is registered again or the index is
+    queried, or, for lazy instances, when any argument is registered), so decorating doesn't
+    pay for it.
     '''
-    def __new__(cls, form='numpy', ignore_args=[], ignore_kws=[], **kwargs):
+    def __new__(cls, form='numpy', ignore_args=[], ignore_kws=[], lazy=False, cache_size=1024,
+                cache_dir=None, parent=None, instrument=False, stats_hook=None,
+                sphinx_only=False, annotations=False, max_default_length=100,
+                default_time_budget=None, **kwargs):
         obj = super().__new__(cls)
         obj.form = form
+        obj.formatter = get_formatter(form)
         obj.ignore_args = ignore_args
         obj.ignore_kws= ignore_kws
-        obj.arguments = {}
-        obj.keywords = {}
+        obj.lazy = lazy
+        obj.sphinx_only = sphinx_only
+        obj.parent = parent
+        obj.__children = WeakSet()
+        _INSTANCES.add(obj)
+        if parent is not None:
+            parent.__children.add(obj)
+        obj.__lock = RLock()
+        obj.__registries = {'argument': Registry(), 'keyword': Registry()}
+        obj.__shared = set()
+        obj.__version = 0
+        obj.__published = None
+        obj.__frozen = False
+        obj.__render_lock = RLock()
+        obj.__fragments = FragmentCache(cache_size)
+        obj.__docstrings = DocstringTable(cache_size)
+        obj.__index = UsageIndex(_parameter_names)
+        obj.__disk_cache = None
+        if cache_dir is not None:
+            from .diskcache import DiskCache
+            obj.__disk_cache = DiskCache(cache_dir)
+        obj.annotations = annotations
+        obj.__render_default = DefaultRenderer(max_default_length, default_time_budget)
+        obj.__format_annotation = None
+        if annotations:
+            from .annotations import format_annotation
+            obj.__format_annotation = format_annotation
+        obj.__stats = None
+        if instrument or stats_hook is not None:
+            from .stats import Stats
+            obj.__stats = Stats(form if isinstance(form, str) else 'custom', hook=stats_hook)
         return obj
 
     def __call__(self, raises=None):
         '''
         Return an instance of the actual decorator.
         '''
-        return self.__ArgDocumenter(self.form, self.arguments, self.keywords, raises,
-                                    self.ignore_args, self.ignore_kws)
+        snapshot = self.__publish()
+        ignore_args = self.ignore_args
+        ignore_kws = self.ignore_kws
+        if self.parent is not None:
+            ignore_args = frozenset(ignore_args).union(*self.parent.__ignored('args'))
+            ignore_kws = frozenset(ignore_kws).union(*self.parent.__ignored('kws'))
+        return self.__ArgDocumenter(self.formatter, snapshot, raises, ignore_args, ignore_kws,
+                                    self.lazy, self.__fragments, self.__docstrings,
+                                    self.__index, self.__disk_cache, self.__stats,
+                                    self.__tag if self.sphinx_only else None, self.__refresh,
+                                    self.__format_annotation, self.__render_default)
+
+    def stats(self):
+        '''
+        Return the statistics collected by an instrumented instance as a dictionary, or `None`
+        if the instance is not instrumented.  The statistics include the number of decorated
+        objects, rendered docstrings, and docstrings reused from overridden methods (see
+        :py:meth:`.ArgDoc.cls`), the total and maximum time spent inspecting signatures and
+        rendering, the number of renders per form, the fragment and disk cache hits and
+        misses, and the slowest objects to document.
+        '''
+        if self.__stats is None:
+            return None
+        stats = self.__stats.as_dict()
+        info = self.__fragments.info()
+        stats['fragment_cache_hits'] = info.hits
+        stats['fragment_cache_misses'] = info.misses
+        return stats
+
+    @property
+    def arguments(self):
+        '''
+        A read-only mapping of the names of the registered positional arguments, including
+        those inherited from `parent`, to their :py:class:`.ParamSpec`.  The mapping is a
+        snapshot that does not change when arguments are registered afterwards.
+        '''
+        return self.__publish()[1]
+
+    @property
+    def keywords(self):
+        '''
+        A read-only mapping of the names of the registered keyword arguments, including those
+        inherited from `parent`, to their :py:class:`.ParamSpec`.  The mapping is a snapshot
+        that does not change when keywords are registered afterwards.
+        '''
+        return self.__publish()[2]
+
+    @staticmethod
+    def __layers(registry):
+        return registry.maps if isinstance(registry, ChainMap) else [registry]
+
+    def __publish(self):
+        '''
+        Return the versions of the registries (see :py:meth:`.ArgDoc.__versions`) and
+        snapshots of the registered positional and keyword arguments, looking through
+        this instance's own registries and then those of its ancestors.  Published registries
+        are never modified; registering an argument copies them first (copy-on-write), so
+        decorators can read them without locking while other threads register arguments.
+        '''
+        with self.__lock:
+            versions = self.__versions()
+            if self.__published is None or self.__published[0] != versions:
+                arguments = self.__registries['argument']
+                keywords = self.__registries['keyword']
+                self.__shared.update(self.__registries)
+                if self.parent is not None:
+                    parent_arguments, parent_keywords = self.parent.__publish()[1:]
+                    arguments = ChainMap(arguments, *self.__layers(parent_arguments))
+                    keywords = ChainMap(keywords, *self.__layers(parent_keywords))
+                self.__published = (versions, arguments, keywords)
+            return self.__published
+
+    def __writable(self, kind):
+        '''
+        Return this instance's own registry of `kind` (`'argument'` or `'keyword'`) so that
+        it can be modified, copying it if it has been published.  The lock must be held.
+        '''
+        if kind in self.__shared:
+            self.__registries[kind] = Registry(self.__registries[kind])
+            self.__shared.discard(kind)
+        return self.__registries[kind]
+
+    def __versions(self):
+        '''
+        Return the number of changes made to the registries of this instance and its ancestors.
+        '''
+        versions = [self.__version]
+        parent = self.parent
+        while parent is not None:
+            versions.append(parent.__version)
+            parent = parent.parent
+        return versions
+
+    def __ignored(self, kind):
+        '''
+        Return the lists of ignored arguments (`kind='args'`) or keywords (`kind='kws'`) of
+        this instance and its ancestors.
+        '''
+        ignored = []
+        obj = self
+        while obj is not None:
+            ignored.append(obj.ignore_args if kind == 'args' else obj.ignore_kws)
+            obj = obj.parent
+        return ignored
+
+    @property
+    def frozen(self):
+        '''
+        Whether the instance has been frozen with :py:meth:`.ArgDoc.freeze`.
+        '''
+        return self.__frozen
+
+    def render_pending(self):
+        '''
+        Render the lazy docstrings of the objects decorated by this instance, and by instances
+        inheriting from it, that haven't been rendered yet, and replace them with plain
+        strings.  Afterwards, code that reads strings directly (e.g. :py:func:`json.dumps` or
+        :py:func:`textwrap.dedent`) sees the full docstrings.  Errors caused by unregistered or
+        misordered arguments are raised now.
+        '''
+        with self.__render_lock:
+            for target in self.__index.targets():
+                doc = target.__doc__
+                if isinstance(doc, _LazyDoc):
+                    target.__doc__ = str(doc)
+        for child in list(self.__children):
+            child.render_pending()
+
+    def freeze(self, gc_freeze=False):
+        '''
+        Prepare the instance, and the instances inheriting from it, to be shared by processes
+        forked from this one (e.g. the workers of a pre-fork server).  Lazy docstrings are
+        rendered, so any errors they would raise are raised now; the registries are flattened
+        into a single read-only snapshot; and new docstrings are written to the disk cache.  If
+        a lazy docstring can't be rendered, its error is raised before anything is frozen.
+        Registering arguments with a frozen instance raises a :py:class:`TypeError`.  An
+        instance inheriting from another can only be frozen once its parent is, since the
+        registries of the parent could still change otherwise; freeze the parent instead.
+
+        If `gc_freeze` is `True`, garbage is collected and every remaining object is moved to
+        the permanent generation with :py:func:`gc.freeze`, so that the garbage collectors of
+        forked processes don't write to the pages holding them.  This affects the whole
+        process, so it should be done last, just before forking.
+        '''
+        if self.parent is not None and not self.parent.frozen:
+            raise TypeError('Cannot freeze an instance whose parent is not frozen')
+        # Render first, including the docstrings of descendants, so that if rendering raises
+        # nothing is frozen and the problem can still be fixed by registering arguments
+        self.render_pending()
+        with self.__lock:
+            self.__frozen = True
+            versions, arguments, keywords = self.__publish()
+            if self.parent is not None:
+                # A single dictionary is smaller and faster to read than a chain of layers
+                self.__published = (versions, Registry(arguments), Registry(keywords))
+        self.save_cache()
+        for child in list(self.__children):
+            child.freeze()
+        if gc_freeze:
+            import gc
+            gc.collect()
+            if hasattr(gc, 'freeze'):
+                gc.freeze()
+
+    def save_cache(self):
+        '''
+        Write newly rendered docstrings to the cache file in `cache_dir`.  This happens
+        automatically when the interpreter exits, but must be called explicitly by processes
+        that exit without running :py:mod:`atexit` handlers (e.g. forked workers).
+        '''
+        if self.__disk_cache is not None:
+            self.__disk_cache.save()
+
+    def document_module(self, module, include=None, exclude=[], recursive=True):
+        '''
+        Document every function and class defined in `module` in a single pass.  Functions
+        and classes imported into `module` from elsewhere are skipped, as are objects that
+        have already been documented by any :py:class:`.ArgDoc` instance (including this one
+        and those inheriting from it) or tagged by a `sphinx_only` one.  Classes are documented
+        using :py:meth:`.ArgDoc.document_class`.
+        '''
+        if sys.flags.optimize >= 2:
+            return module
+        if include is None:
+            include = getattr(module, '__all__', None)
+        documenter = self()
+        for name, member in list(vars(module).items()):
+            if include is None:
+                if name.startswith('_'):
+                    continue
+            elif name not in include:
+                continue
+            if name in exclude or getattr(member, '__module__', None) != module.__name__:
+                continue
+            if isinstance(member, type):
+                self.__document_class(documenter, member, recursive)
+            elif isinstance(member, FunctionType) and not self.__documented(member):
+                documenter(member)
+        return module
+
+    def document_class(self, cls, recursive=True):
+        '''
+        Document the public methods of `cls` along with its `__init__`, `__new__`, and
+        `__call__` methods in a single pass.  Static methods and class methods are
+        documented through the functions that they wrap.  Inherited methods and methods that
+        have already been documented or tagged by any :py:class:`.ArgDoc` instance are skipped.  This can also be used
+        as a class decorator.
+        '''
+        if sys.flags.optimize >= 2:
+            return cls
+        self.__document_class(self(), cls, recursive)
+        return cls
+
+    def cls(self, cls, recursive=True):
+        '''
+        Class decorator that documents `cls`, like :py:meth:`.ArgDoc.document_class`, and
+        every subclass of `cls` when the subclass is defined.  Methods that override a method
+        of a base class without a docstring of their own inherit the original docstring of the
+        method that they override.  Subclasses are documented from `__init_subclass__`, so
+        subclasses that override it must call `super().__init_subclass__()`.
+        '''
+        if sys.flags.optimize >= 2:
+            return cls
+        self.__document_class(self(), cls, recursive, inherit=True)
+
+        arg_doc = self
+        previous = vars(cls).get('__init_subclass__')
+
+        def __init_subclass__(subcls, **kwargs):
+            if previous is None:
+                super(cls, subcls).__init_subclass__(**kwargs)
+            else:
+                previous.__get__(None, subcls)(**kwargs)
+            arg_doc.__document_class(arg_doc(), subcls, recursive, inherit=True)
+
+        cls.__init_subclass__ = classmethod(__init_subclass__)
+        return cls
+
+    def __document_class(self, documenter, cls, recursive, inherit=False):
+        '''
+        Document the members of `cls`.  Methods that override a method of a base class with the
+        same parameters and original docstring reuse its rendered docstring.
+        '''
+        for name, member in list(vars(cls).items()):
+            if isinstance(member, type):
+                # Only descend into classes defined in the body of cls
+                if recursive and member.__qualname__ == '{}.{}'.format(cls.__qualname__, name):
+                    self.__document_class(documenter, member, recursive, inherit)
+                continue
+            if name.startswith('_') and name not in SPECIAL_METHODS:
+                continue
+            func = member.__func__ if isinstance(member, (staticmethod, classmethod)) else member
+            if not isinstance(func, FunctionType) or self.__documented(func):
+                continue
+            for base in cls.__mro__[1:]:
+                if name in vars(base):
+                    documenter.override(member, vars(base)[name], inherit)
+                    break
+            else:
+                documenter(member)
+
+    @staticmethod
+    def __documented(target):
+        '''
+        Return whether `target` has been documented by any :py:class:`.ArgDoc` instance or
+        tagged by a `sphinx_only` one.
+        '''
+        # Tagged objects are indexed too
+        return any(target in arg_doc.__index for arg_doc in list(_INSTANCES))
+
+    def cache_info(self):
+        '''
+        Return the number of hits and misses, the maximum size, and the current size of the
+        cache of rendered parameter entries.
+        '''
+        return self.__fragments.info()
+
+    def users_of(self, name):
+        '''
+        Return the objects decorated by this instance, or by instances inheriting from it,
+        that have a parameter called `name`.
+        '''
+        users = self.__index.users_of(name)
+        for child in self.__children:
+            users.extend(child.users_of(name))
+        return users
+
+    def __used(self):
+        used = self.__index.used()
+        for child in self.__children:
+            used |= child.__used()
+        return used
+
+    def unused(self):
+        '''
+        Return the sorted names of the registered positional and keyword arguments that are
+        not used by any object decorated by this instance, or by instances inheriting from it.
+        '''
+        return sorted((self.arguments.keys() | self.keywords.keys()) - self.__used())
+
+    def record(self, obj):
+        '''
+        Return the :py:class:`.DocRecord` that the docstring of `obj`, which must have been
+        decorated by this instance or by an instance inheriting from it, was rendered from.
+        Records aren't kept when objects are decorated, so that decorated objects stay small;
+        the record is built the first time it is asked for and attached to `obj` as
+        `obj.__argdoc__`, until `obj` is documented again.
+        '''
+        record = self.__record(obj, attach=True)
+        if record is None:
+            raise ValueError('{!r} was not documented by this instance'.format(obj))
+        return record
+
+    def __record(self, obj, attach):
+        '''
+        Return the :py:class:`.DocRecord` of `obj`, building it if `obj` has none (and
+        attaching it if `attach` is `True`), or `None` if `obj` was not documented by this
+        instance or its descendants.
+        '''
+        if isinstance(obj, (staticmethod, classmethod)):
+            obj = obj.__func__
+        record = record_of(obj)
+        if record is not None:
+            return record
+        target = getattr(obj, '__func__', obj)
+        found = self.__source(target)
+        if found is None:
+            return None
+        arg_doc, (obj, doc, raises) = found
+        record = arg_doc(raises).record(obj, doc)
+        if attach:
+            _set_record(target, record)
+        return record
+
+    def render(self, obj, form=None):
+        '''
+        Return the docstring of `obj`, which must have been decorated by this instance or by an
+        instance inheriting from it, rendered from its :py:class:`.DocRecord` (see
+        :py:meth:`.ArgDoc.record`) in `form`: the name of a registered formatter, a
+        :py:class:`.Formatter`, or `'json'` for the record as a JSON object.  If `form` is
+        `None`, the form of this instance is used.  Rendered docstrings are cached for each
+        form.
+        '''
+        return self.record(obj).render(self.formatter if form is None else form)
+
+    def iter_documented(self, package):
+        '''
+        Yield the qualified name and :py:class:`.DocRecord` of each function, method, and class
+        in `package` (a module or package, or its name) and its submodules that was documented
+        by this instance or by an instance inheriting from it.  Submodules are imported as they
+        are reached, so records can be written out (see :py:mod:`argdoc.export`) while the rest
+        of the package is walked.  Records that have to be built are not attached to their
+        objects, so memory use doesn't grow with the size of the package.
+        '''
+        import importlib
+        import pkgutil
+        if isinstance(package, str):
+            package = importlib.import_module(package)
+        yield from self.__iter_members(package, package.__name__, vars(package))
+        if hasattr(package, '__path__'):
+            for info in pkgutil.walk_packages(package.__path__, package.__name__ + '.'):
+                module = importlib.import_module(info.name)
+                yield from self.__iter_members(module, module.__name__, vars(module))
+
+    def __iter_members(self, module, prefix, members):
+        '''
+        Yield the names and records of the documented objects among `members`, the namespace
+        of `module` or of a class in it whose qualified name is `prefix`.
+        '''
+        for name, member in list(members.items()):
+            func = member.__func__ if isinstance(member, (staticmethod, classmethod)) else member
+            # Skip imported objects and aliases
+            if (getattr(func, '__module__', None) != module.__name__
+                    or getattr(func, '__name__', None) != name):
+                continue
+            if isinstance(func, type):
+                record = self.__record(func, attach=False)
+                if record is not None:
+                    yield '{}.{}'.format(prefix, name), record
+                yield from self.__iter_members(module, '{}.{}'.format(prefix, name), vars(func))
+            elif callable(func):
+                record = self.__record(func, attach=False)
+                if record is not None:
+                    yield '{}.{}'.format(prefix, name), record
+
+    def __source(self, target):
+        '''
+        Return the instance that indexed `target`, this one or one inheriting from it, and
+        the source of `target` in its index (see :py:meth:`.UsageIndex.source`), or `None`.
+        '''
+        source = self.__index.source(target)
+        if source is not None:
+            return self, source
+        for child in self.__children:
+            found = child.__source(target)
+            if found is not None:
+                return found
+        return None
+
+    def __rerender(self, names, new=()):
+        '''
+        Render the docstrings of the decorated objects that use any of `names` again.  The
+        names in `new` weren't registered before, so only objects with lazy docstrings, which
+        are rendered from the arguments registered when they were decorated, can use them.
+        '''
+        targets = {}
+        for name in names:
+            if name in new and not self.lazy:
+                # Skipping these means registering new names never has to build the index
+                continue
+            for target in self.__index.users_of(name):
+                targets[id(target)] = target
+        self.__rerender_targets(targets.values())
+        for child in self.__children:
+            child.__rerender(names, new)
+
+    def __registered(self, name, kind):
+        '''
+        Return whether `name` is registered as a `kind` (`'argument'` or `'keyword'`) with this
+        instance or its ancestors.
+        '''
+        obj = self
+        while obj is not None:
+            if name in obj.__registries[kind]:
+                return True
+            obj = obj.parent
+        return False
+
+    def __rerender_targets(self, targets):
+        if self.sphinx_only:
+            # Only tagged objects are indexed, and argdoc.sphinx renders them from the arguments
+            # registered when the documentation is built
+            return
+        # Re-rendering is serialized so that the last docstring assigned to each object is
+        # rendered from the latest registries
+        with self.__render_lock:
+            for target in targets:
+                source = self.__index.source(target)
+                if source is not None:
+                    obj, doc, raises = source
+                    self(raises).document(obj, doc)
+
+    def __refresh(self, target, obj, snapshot):
+        '''
+        Render the docstring of `target` again if any of the parameters of `obj` were
+        registered again since it was rendered from `snapshot` (see :py:meth:`.ArgDoc.__publish`),
+        as the registration may have happened before `target` was indexed.  Registered
+        arguments are replaced rather than modified, so each name's :py:class:`.ParamSpec`
+        serves as its version, and registering other names doesn't cause any rendering.
+        '''
+        versions, arguments, keywords = snapshot
+        if self.__versions() == versions:
+            return
+        current = self.__publish()
+        for name in _parameter_names(obj):
+            if (current[1].get(name) is not arguments.get(name)
+                    or current[2].get(name) is not keywords.get(name)):
+                self.__rerender_targets([target])
+                return
+
+    def __tag(self, obj, raises):
+        '''
+        Tag `obj`, which raises the errors `raises`, for rendering by the :py:mod:`argdoc.sphinx`
+        extension and index it.  Raises a :py:class:`TypeError` if `obj` can't be weakly
+        referenced.
+        '''
+        _SPHINX_TAGGED[obj] = (self, raises)
+        self.__index.add(obj, obj, obj.__doc__ or '', raises)
 
     class __ArgDocumenter:
-        def __init__(self, form, arguments, keywords, raises, ignore_args, ignore_kws):
+        def __init__(self, formatter, snapshot, raises, ignore_args, ignore_kws, lazy,
+                     fragments, docstrings, index, disk_cache, stats, tag, refresh,
+                     format_annotation, render_default):
             '''
             This is the actual decorator, which is contstructed by :py:class:`.ArgDoc.__call__`.
             :py:class:`.__ArgDocumenter` should never be instantiated directly.
             '''
-            self.form = form
-            self.arguments = arguments
-            self.keywords = keywords
+            self.formatter = formatter
+            self.snapshot = snapshot
+            self.arguments = snapshot[1]
+            self.keywords = snapshot[2]
             self.ignore_args = ignore_args
             self.ignore_kws = ignore_kws
             self.raises = raises
+            self.lazy = lazy
+            self.fragments = fragments
+            self.docstrings = docstrings
+            self.index = index
+            self.disk_cache = disk_cache
+            self.stats = stats
+            self.tag = tag
+            self.refresh = refresh
+            self.format_annotation = format_annotation
+            self.render_default = render_default
+            # Choose once so that there is no instrumentation overhead when disabled
+            self.render_doc = self.__render_doc if stats is None else self.__timed_render_doc
 
         def __call__(self, obj):
             '''
             Inspect the input object and add a "parameters" section to its docstring
             based on its argspec.
             '''
-            if hasattr(obj, '__doc__'):
-                # Get the original docstring and signature
-                doc = getdoc(obj)
-                if not doc:
-                    doc = ''
-                sig = signature(obj)
-
-                # Add parameters
-                has_args = False
-                has_keywords = False
-                has_vargs = False
-                has_vkeywords = False
-                for param in sig.parameters.values():
-                    if param.kind in POSITIONALS and param.default is _empty:
-                        if param.name in self.ignore_args:
-                            continue
-                        if has_keywords:
-                            raise ValueError('Argument encountered after keyword')
-                        if has_vargs:
-                            raise ValueError('Argument encountered after vargs')
-                        if not has_args:
-                            has_args = True
-                            doc += self.__get_argument_header()
-                        if param.kind == VAR_POSITIONAL:
-                            has_vargs = True
-                            doc += self.__create_vargs_doc(param)
-                        else:
-                            doc += self.__create_argument_doc(param)
-                    else:
-                        if param.name in self.ignore_kws:
-                            continue
-                        if has_vargs:
-                            raise ValueError('Keyword encountered after vargs')
-                        if has_vkeywords:
-                            raise ValueError('Keyword encountered after vkeywords')
-                        if not has_keywords:
-                            has_keywords = True
-                            doc += self.__get_keyword_header()
-                        if param.kind == VAR_KEYWORD:
-                            has_vkeywords = True
-                            doc += self.__create_vkeywords_doc(param)
-                        else:
-                            doc += self.__create_keyword_doc(param)
-
-                # Add errors
-                if self.raises:
-                    doc += self.__get_error_header()
-                    for ename, econd in self.raises.items():
-                        doc += self.__create_error_doc(ename, econd)
-
-                doc += '    \n'
+            if sys.flags.optimize >= 2:
+                # Docstrings are stripped under -OO so there is nothing to do
+                return obj
+            if isinstance(obj, (staticmethod, classmethod)):
+                # Document the wrapped function, which is where the docstring is looked up
+                self(obj.__func__)
+                return obj
+            if not hasattr(obj, '__doc__'):
+                raise AttributeError('Object has no docstring')
+            if self.stats is not None:
+                self.stats.decorations += 1
+            if self.tag is not None:
+                # Leave rendering to the argdoc.sphinx extension, if obj can be tagged
+                try:
+                    self.tag(obj, self.raises)
+                    return obj
+                except TypeError:
+                    pass
 
+            # Get the original docstring.  inspect.getdoc isn't used since it would return
+            # the docstring already rendered for a base class's method.
+            return self.document(obj, obj.__doc__ or '')
+
+        def document(self, obj, original):
+            '''
+            Set the docstring of `obj` to the one rendered from its original docstring,
+            `original`, and return `obj`.
+            '''
+            if self.lazy:
+                doc = _LazyDoc(original, partial(self.__lazy_doc, obj, original))
             else:
-                raise AttributeError('Object has no docstring')
+                doc = self.__create_doc(obj, original)[0]
+
+            target = obj
             try:
-                obj.__doc__ = doc
+                target.__doc__ = doc
             except AttributeError:
-                # Required for python 2.7
-                obj.__func__.__doc__ = doc
+                # Bound methods get their docstring from the underlying function
+                target = obj.__func__
+                target.__doc__ = doc
+            _drop_record(target)
+            try:
+                self.index.add(target, obj, original, self.raises)
+            except TypeError:
+                # Not all objects can be weakly referenced
+                return obj
+            self.refresh(target, obj, self.snapshot)
             return obj
 
-        def __get_argument_header(self):
-            if self.form == 'numpy':
-                return '\n\nArguments\n----------\n'
-            elif self.form == 'google':
-                return '\n\nArgs:\n'
-
-        def __get_keyword_header(self):
-            if self.form == 'numpy':
-                return '\n\nKeyword Arguments\n-----------------\n'
-            elif self.form == 'google':
-                return '\n\nKeywords:\n'
-
-        def __get_error_header(self):
-            if self.form == 'numpy':
-                return '\n\nRaises\n------\n'
-            elif self.form == 'google':
-                return '\n\nRaises:\n'
-
-        def __create_argument_doc(self, param):
+        def override(self, obj, base, inherit=False):
+            '''
+            Document `obj`, which overrides `base`, by reusing the docstring rendered for `base`
+            if they have the same parameters and original docstrings.  If `inherit` is `True`
+            and `obj` has no docstring, the original docstring of `base` is used.
+            '''
+            if sys.flags.optimize >= 2:
+                return obj
+            func = getattr(obj, '__func__', obj)
+            base_func = getattr(base, '__func__', base)
+            source = None
+            if (self.tag is None and type(obj) is type(base)
+                    and type(func) is FunctionType and type(base_func) is FunctionType
+                    and base_func in self.index):
+                source = self.index.source(base_func)
+            if source is None or source[2] != self.raises:
+                return self(obj)
+            original = func.__doc__
+            if original is None and inherit:
+                original = source[1]
+            if original is None:
+                return self(obj)
+
+            if self.stats is not None:
+                self.stats.decorations += 1
+            if (original == source[1] and not hasattr(func, '__wrapped__')
+                    and not hasattr(base_func, '__wrapped__')
+                    and (self.format_annotation is None
+                         or func.__annotations__ == base_func.__annotations__)
+                    and self.__rendered_signature(func) == self.__rendered_signature(base_func)):
+                if self.stats is not None:
+                    self.stats.reused += 1
+                func.__doc__ = base_func.__doc__
+                _drop_record(func)
+                self.index.add(func, func, original, self.raises)
+                self.refresh(func, func, self.snapshot)
+                return obj
+            self.document(func, original)
+            return obj
+
+        def docstring(self, obj, doc=''):
+            '''
+            Return the docstring that decorating `obj` would produce, starting from the
+            original docstring, `doc`, without modifying `obj`.
+            '''
+            return self.__create_doc(obj, doc)[0]
+
+        def record(self, obj, doc=''):
+            '''
+            Return the :py:class:`.DocRecord` that decorating `obj` would render its docstring
+            from, starting from the original docstring, `doc`, without modifying `obj`.
+            '''
+            return self.__render_params(signature(obj), doc)[1]
+
+        def record_signature(self, sig, doc=''):
+            '''
+            Return the :py:class:`.DocRecord` of the parameters in the
+            :py:class:`inspect.Signature`, `sig`, and the original docstring, `doc`.  This is
+            used to export records of functions that have not been imported.
+            '''
+            return self.__render_params(sig, doc)[1]
+
+        def render_signature(self, sig, doc=''):
+            '''
+            Return the docstring produced by adding the parameters in the
+            :py:class:`inspect.Signature`, `sig`, to the original docstring, `doc`.  This is
+            used to render docstrings for functions that have not been imported.
+            '''
+            return self.__render_params(sig, doc)[0]
+
+        def check_signature(self, sig):
+            '''
+            Return a list describing every problem (unregistered or misordered arguments) that
+            would prevent the parameters in the :py:class:`inspect.Signature`, `sig`, from
+            being rendered, rather than raising on the first one.
+            '''
+            problems = []
+            has_keywords = False
+            has_vargs = False
+            has_vkeywords = False
+            for param in sig.parameters.values():
+                if param.kind in POSITIONALS and param.default is _empty:
+                    if param.name in self.ignore_args:
+                        continue
+                    if has_keywords:
+                        problems.append('Argument encountered after keyword: {}'.format(
+                            param.name))
+                    if has_vargs:
+                        problems.append('Argument encountered after vargs: {}'.format(param.name))
+                    if param.kind == VAR_POSITIONAL:
+                        has_vargs = True
+                    elif param.name not in self.arguments:
+                        problems.append('Unregistered argument: {}'.format(param.name))
+                else:
+                    if param.name in self.ignore_kws:
+                        continue
+                    if has_vargs:
+                        problems.append('Keyword encountered after vargs: {}'.format(param.name))
+                    if has_vkeywords:
+                        problems.append('Keyword encountered after vkeywords: {}'.format(
+                            param.name))
+                    has_keywords = True
+                    if param.kind == VAR_KEYWORD:
+                        has_vkeywords = True
+                    elif param.name not in self.keywords:
+                        problems.append('Unregistered keyword: {}'.format(param.name))
+            return problems
+
+        def fingerprint(self, obj, doc=''):
+            '''
+            Return everything that the docstring rendered for `obj` from `doc` depends on, or
+            `None` if that can't be determined without inspecting the signature of `obj`.
+            '''
+            if type(obj) is not FunctionType or hasattr(obj, '__wrapped__'):
+                return None
+            return self.__fingerprint(obj, doc)
+
+        def __lazy_doc(self, obj, doc):
+            '''
+            Render the docstring of `obj` for a :py:class:`._LazyDoc`.
+            '''
+            return self.__create_doc(obj, doc)[0]
+
+        def __create_doc(self, obj, doc):
+            '''
+            Return the full docstring for `obj` from the disk cache or by rendering it from
+            its original docstring, `doc`, and the :py:class:`.DocRecord` it was rendered from
+            (`None` if it was loaded from the disk cache).
+            '''
+            # Only plain functions can be fingerprinted without inspecting their signature
+            if (self.disk_cache is None or type(obj) is not FunctionType
+                    or hasattr(obj, '__wrapped__')):
+                return self.render_doc(obj, doc)
+
+            qualname = '{}.{}'.format(obj.__module__, obj.__qualname__)
+            digest = self.disk_cache.digest(self.__fingerprint(obj, doc))
+            cached = self.disk_cache.get(qualname, digest)
+            if self.stats is not None:
+                if cached is None:
+                    self.stats.disk_misses += 1
+                else:
+                    self.stats.disk_hits += 1
+            if cached is not None:
+                return self.docstrings.intern(cached), None
+            doc, record = self.render_doc(obj, doc)
+            self.disk_cache.set(qualname, digest, doc)
+            return doc, record
+
+        def __rendered_signature(self, func):
+            '''
+            Return the signature of the function `func` read from its code object (see
+            :py:func:`._code_signature`) with its defaults as they are rendered.  Only the
+            rendered defaults matter, they tell apart values that compare equal (e.g. `1` and
+            `True`), and they are much cheaper to repr than arbitrary objects.
+            '''
+            code_signature = _code_signature(func)
+            defaults, kwdefaults = code_signature[5:7]
+            if defaults is not None:
+                defaults = tuple(map(self.render_default, defaults))
+            if kwdefaults is not None:
+                kwdefaults = tuple((name, self.render_default(value))
+                                   for name, value in kwdefaults.items())
+            return code_signature[:5] + (defaults, kwdefaults)
+
+        def __fingerprint(self, obj, doc):
+            '''
+            Collect everything that the rendered docstring of the function `obj` depends on.
+            '''
+            code_signature = self.__rendered_signature(obj)
+            entries = tuple((self.arguments.get(name), self.keywords.get(name))
+                            for name in code_signature[4])
+            raises = tuple(self.raises.items()) if self.raises else None
+            fingerprint = ((self.formatter.fingerprint, tuple(sorted(self.ignore_args)),
+                            tuple(sorted(self.ignore_kws))) + code_signature
+                           + (doc, raises, entries))
+            if self.format_annotation is not None:
+                annotations = obj.__annotations__
+                fingerprint += (tuple(self.format_annotation(annotations[name])
+                                      if name in annotations else None
+                                      for name in code_signature[4]),)
+            return fingerprint
+
+        def __render_doc(self, obj, doc):
+            '''
+            Render the full docstring for `obj` from its original docstring, `doc`, and return
+            it with its :py:class:`.DocRecord`.
+            '''
+            return self.__render_params(signature(obj), doc)
+
+        def __timed_render_doc(self, obj, doc):
+            '''
+            Render the full docstring for `obj` and record how long it took.
+            '''
+            start = perf_counter()
+            sig = signature(obj)
+            inspected = perf_counter()
+            rendered = self.__render_params(sig, doc)
+            self.stats.record(obj, inspected - start, perf_counter() - inspected)
+            return rendered
+
+        def __render_params(self, sig, doc):
+            '''
+            Add the parameters in the signature, `sig`, to the original docstring, `doc`.
+            Return the docstring and the :py:class:`.DocRecord` that it was rendered from.
+            '''
+            fmt = self.formatter
+            doc = cleandoc(doc) if doc else ''
+            parts = [doc]
+            arguments = []
+            keywords = []
+            vargs = None
+            vkeywords = None
+
+            # Add parameters
+            has_args = False
+            has_keywords = False
+            has_vargs = False
+            has_vkeywords = False
+            for param in sig.parameters.values():
+                if param.kind in POSITIONALS and param.default is _empty:
+                    if param.name in self.ignore_args:
+                        continue
+                    if has_keywords:
+                        raise ValueError('Argument encountered after keyword')
+                    if has_vargs:
+                        raise ValueError('Argument encountered after vargs')
+                    if not has_args:
+                        has_args = True
+                        parts.append(fmt.argument_header)
+                    if param.kind == VAR_POSITIONAL:
+                        has_vargs = True
+                        vargs = param.name
+                        parts.append(fmt.vargs(name=param.name))
+                    else:
+                        parts.append(self.__create_argument_doc(param, arguments))
+                else:
+                    if param.name in self.ignore_kws:
+                        continue
+                    if has_vargs:
+                        raise ValueError('Keyword encountered after vargs')
+                    if has_vkeywords:
+                        raise ValueError('Keyword encountered after vkeywords')
+                    if not has_keywords:
+                        has_keywords = True
+                        parts.append(fmt.keyword_header)
+                    if param.kind == VAR_KEYWORD:
+                        has_vkeywords = True
+                        vkeywords = param.name
+                        parts.append(fmt.vkeywords(name=param.name))
+                    else:
+                        parts.append(self.__create_keyword_doc(param, keywords))
+
+            # Add errors
+            raises = ()
+            if self.raises:
+                raises = tuple(self.raises.items())
+                parts.append(fmt.error_header)
+                for ename, econd in raises:
+                    parts.append(fmt.error(name=ename, desc=econd))
+
+            if len(parts) > 1:
+                parts.insert(1, fmt.preamble)
+            parts.append(fmt.footer)
+            record = DocRecord(doc, tuple(arguments), vargs, tuple(keywords), vkeywords, raises)
+            doc = ''.join(parts)
+            return self.docstrings.intern(doc), record
+
+        def __type(self, param, info):
+            '''
+            Return the documented type of `param`: its annotation, if annotations are used and
+            it has one, and otherwise the type registered in `info`.
+            '''
+            if self.format_annotation is None or param.annotation is _empty:
+                return info.type
+            return self.format_annotation(param.annotation)
+
+        def __create_argument_doc(self, param, arguments):
+            '''
+            Return the rendered entry of the positional argument `param` and add its record
+            entry to `arguments`.
+            '''
             info = self.arguments[param.name]
-            if self.form == 'numpy':
-                argstr = '{} : {}\n    {}\n'.format(param.name, info['type'], info['desc'])
-            elif self.form == 'google':
-                argstr = '    {} ({}): {}\n'.format(param.name, info['type'], info['desc'])
-            return argstr
+            typ = self.__type(param, info)
+            key = (param.name, 'argument', typ)
+            # Record entries are cached with the rendered entries so that records share them
+            fragment = self.fragments.get(key, info)
+            if fragment is None:
+                fragment = (self.formatter.argument(name=param.name, type=typ, desc=info.desc),
+                            Argument(param.name, typ, info.desc))
+                self.fragments.set(key, info, fragment)
+            arguments.append(fragment[1])
+            return fragment[0]
 
-        def __create_keyword_doc(self, param):
+        def __create_keyword_doc(self, param, keywords):
+            '''
+            Return the rendered entry of the keyword argument `param` and add its record entry
+            to `keywords`.
+            '''
             info = self.keywords[param.name]
-            try:
-                default = info['default']
-            except KeyError:
+            default = info.default
+            if default is _empty:
                 default = param.default
-            if self.form == 'numpy':
-                argstr = '{} : {}, optional\n    {} Default: {}\n'.format(
-                    param.name, info['type'], info['desc'], default)
-            elif self.form == 'google':
-                argstr = '    {} ({}, optional): {}\n'.format(
-                    param.name, info['type'], info['desc'], default)
-            return argstr
-
-        def __create_vargs_doc(self, param):
-            if self.form == 'numpy':
-                argstr = '*{}\n    Variable length argument list.'.format(param.name)
-            elif self.form == 'google':
-                argstr = '    *{}: Variable length argument list.'.format(param.name)
-            return argstr
-
-        def __create_vkeywords_doc(self, param):
-            if self.form == 'numpy':
-                argstr = '**{}\n    Arbitrary keyword arguments.'.format(param.name)
-            elif self.form == 'google':
-                argstr = '    **{}: Arbitrary keyword arguments.'.format(param.name)
-            return argstr
-
-        def __create_error_doc(self, name, condition):
-            if self.form == 'numpy':
-                argstr = '{}\n    {}\n'.format(name, condition)
-            elif self.form == 'google':
-                argstr = '    {}: {}\n'.format(name, condition)
-            return argstr
+            default = self.render_default(default)
+            typ = self.__type(param, info)
+            key = (param.name, 'keyword', default, typ)
+            fragment = self.fragments.get(key, info)
+            if fragment is None:
+                fragment = (self.formatter.keyword(name=param.name, type=typ, desc=info.desc,
+                                                   default=default),
+                            Keyword(param.name, typ, info.desc, default))
+                self.fragments.set(key, info, fragment)
+            keywords.append(fragment[1])
+            return fragment[0]
 
     def __register_param(self, name, typ, desc, default=None, force=False, keyword=False):
         if keyword:
             errstr = 'Keyword argument'
-            store = self.keywords
+            kind = 'keyword'
         else:
             errstr = 'Positional argument'
-            store = self.arguments
+            kind = 'argument'
+        try:
+            typ = typ.__name__
+        except AttributeError:
+            typ = str(typ)
+        spec = ParamSpec(typ, desc, _empty if default is None else default)
 
-        if not force and name in store:
-            raise KeyError('{} {} already registered.'.format(errstr, name))
-        else:
-            try:
-                typ = typ.__name__
-            except AttributeError:
-                typ = str(typ)
-            store[name] = {'type': typ,
-                              'desc': desc}
-            if default is not None:
-                store[name]['default'] = default
+        with self.__lock:
+            self.__check_frozen()
+            if name in self.__registries[kind]:
+                if not force:
+                    raise KeyError('{} {} already registered.'.format(errstr, name))
+                self.__fragments.invalidate(name, kind)
+            new = () if self.__registered(name, kind) else (name,)
+            self.__writable(kind)._set(name, spec)
+            self.__version += 1
+        self.__rerender([name], new)
+
+    def __check_frozen(self):
+        if self.__frozen:
+            raise TypeError('Arguments cannot be registered with a frozen ArgDoc instance')
 
     def register_argument(self, name, typ, desc, force=False):
         '''
@@ -235,9 +1226,56 @@ class ArgDoc:
         '''
         self.__register_param(name, typ, desc, default=default, force=force, keyword=True)
 
+    def load_registry(self, path, force=False):
+        '''
+        Register all of the positional and keyword arguments stored in the registry file at
+        `path` in one operation.  The file must be a JSON, TOML (read with tomli, which is
+        installed along with argdoc, before Python 3.11), or YAML (if PyYAML is installed) file
+        containing an `arguments` table and a `keywords` table that map names to tables with a
+        `type`, a `desc`, and, for keywords, an optional `default`.  This is the format written
+        by :py:meth:`.ArgDoc.dump_registry`.
+
+        The parsed registry is compiled into a sidecar file next to `path` (`path` with
+        `.marshal` appended) that is loaded instead of parsing `path` again for as long as
+        `path` is unchanged.  If any of the arguments have already been registered, a
+        :py:class:`KeyError` will be raised and nothing will be registered.
+        '''
+        from .loaders import read_registry
+        arguments, keywords = read_registry(path)
+        with self.__lock:
+            self.__check_frozen()
+            if not force:
+                for errstr, kind, new in (('Positional argument', 'argument', arguments),
+                                          ('Keyword argument', 'keyword', keywords)):
+                    duplicates = self.__registries[kind].keys() & new.keys()
+                    if duplicates:
+                        raise KeyError('{}s {} already registered.'.format(
+                            errstr, ', '.join(sorted(duplicates))))
+            unregistered = set()
+            for kind, new in (('argument', arguments), ('keyword', keywords)):
+                store = self.__writable(kind)
+                for name in store.keys() & new.keys():
+                    self.__fragments.invalidate(name, kind)
+                unregistered.update(name for name in new if not self.__registered(name, kind))
+                store._update(new)
+            self.__version += 1
+        self.__rerender(arguments.keys() | keywords.keys(), unregistered)
+
+    def dump_registry(self, path):
+        '''
+        Write all of the registered positional and keyword arguments to the registry file at
+        `path` so that they can be loaded with :py:meth:`.ArgDoc.load_registry`.  The format
+        is chosen based on the extension of `path`: JSON (`.json`), TOML (`.toml`, requires
+        tomli-w), or YAML (`.yaml` or `.yml`, requires PyYAML).
+        '''
+        from .loaders import write_registry
+        write_registry(path, {name: dict(spec) for name, spec in self.arguments.items()},
+                       {name: dict(spec) for name, spec in self.keywords.items()})
+
 
 # Use ArgDoc to document itself!
-__arg_doc = ArgDoc(ignore_args=['self', 'cls'])
+# This is done lazily to keep the cost of importing argdoc down.
+__arg_doc = ArgDoc(ignore_args=['self', 'cls'], lazy=True)
 
 obj_desc = 'A callable object whose docstring should be updated.'
 name_desc = 'The name of a positional argument that should be handled by the :py:class::`.ArgDoc` instance.'
@@ -250,9 +1288,15 @@ default_desc = ('The default value to be used in docstrings.  If `None`, the def
                 '**no effect on the code** and is for documentation purposes only.')
 force_desc = ('If set to `True`, allow arguments to be replaced if an attempt is made to register '
               'a previously registered argument.')
-form_desc = 'Docstring specification to be followed: one of "numpy" or "google"'
+form_desc = ('Docstring specification to be followed: the name of a registered formatter (e.g. '
+             '"numpy", "google", "sphinx", or "epytext") or a :py:class:`.Formatter` instance.')
 ignore_args_desc = 'Names of positional arguments to be ignored.'
 ignore_kws_desc = 'Names of keyword arguments to be ignored.'
+cache_size_desc = ('Maximum number of rendered parameter entries to cache, and of identical '
+                   'docstrings to share.  If `None`, the caches are unbounded and if `0`, '
+                   'nothing is cached.')
+lazy_desc = ('If set to `True`, defer rendering docstrings until they are first used rather than '
+             'rendering them when objects are decorated.')
 raises_desc = ('A dictionary whose keys are possible error types that may be raised by the decorated '
                'object and whose values describe the contditions under which the error will be raised.')
 
@@ -262,14 +1306,76 @@ __arg_doc.register_argument('typ', 'type or str', typ_desc)
 __arg_doc.register_argument('desc', str, desc_desc)
 __arg_doc.register_keyword('default', bool, default_desc)
 __arg_doc.register_keyword('force', bool, force_desc)
-__arg_doc.register_keyword('form', str, form_desc)
+__arg_doc.register_keyword('form', 'str or Formatter', form_desc)
 __arg_doc.register_keyword('ignore_args', 'list of str', ignore_args_desc)
 __arg_doc.register_keyword('ignore_kws', 'list of str', ignore_kws_desc)
+__arg_doc.register_keyword('lazy', bool, lazy_desc)
+__arg_doc.register_keyword('cache_size', 'int or None', cache_size_desc)
+__arg_doc.register_keyword('parent', 'ArgDoc',
+                           'An instance whose registered and ignored arguments are inherited.  If '
+                           '`None`, nothing is inherited.')
+__arg_doc.register_keyword('instrument', bool,
+                           'If set to `True`, record statistics that can be retrieved with '
+                           ':py:meth:`.ArgDoc.stats`.')
+__arg_doc.register_keyword('stats_hook', 'callable',
+                           'Called with a dictionary of timings for each rendered docstring.  '
+                           'If not `None`, statistics are recorded as though `instrument` is `True`.')
+__arg_doc.register_keyword('sphinx_only', bool,
+                           'If set to `True`, only tag decorated objects and leave adding the '
+                           'parameters to the :py:mod:`argdoc.sphinx` extension.')
+__arg_doc.register_keyword('cache_dir', str,
+                           'Directory in which to cache rendered docstrings between processes.  '
+                           'If `None`, docstrings are not cached between processes.')
+__arg_doc.register_keyword('annotations', bool,
+                           'If set to `True`, document the types of annotated parameters from '
+                           'their annotations rather than from the registered types.')
+__arg_doc.register_keyword('max_default_length', 'int or None',
+                           'Maximum length of the default values shown in docstrings.  If `None`, '
+                           'default values are shown in full.')
+__arg_doc.register_keyword('default_time_budget', 'float or None',
+                           'Seconds that converting a default value to a string may take before '
+                           'values of its type are only shown by type.  If `None`, there is no '
+                           'limit.')
+__arg_doc.register_keyword('gc_freeze', bool,
+                           'If set to `True`, also collect garbage and freeze the garbage '
+                           'collector with :py:func:`gc.freeze`.')
+__arg_doc.register_argument('path', str, 'Path to a JSON, TOML, or YAML registry file.')
+__arg_doc.register_argument('package', 'module or str',
+                            'The package or module, or its name, whose documented objects should '
+                            'be walked.')
+__arg_doc.register_argument('module', 'module', 'The module whose members should be documented.')
+__arg_doc.register_keyword('include', 'list of str',
+                           'Names of the members to document.  If `None`, the names in the '
+                           "module's `__all__` are used or, if it has no `__all__`, all public names.")
+__arg_doc.register_keyword('exclude', 'list of str', 'Names of members that should not be documented.')
+__arg_doc.register_keyword('recursive', bool,
+                           'If set to `True`, also document classes defined within documented classes.')
 __arg_doc.register_keyword('raises', 'dict', raises_desc)
 
-raises = {'KeyError': 'If an argument has already been registered under the same name and `force` is `False`'}
+raises = {'KeyError': 'If an argument has already been registered under the same name and `force` is `False`',
+          'TypeError': 'If the instance has been frozen with :py:meth:`.ArgDoc.freeze`'}
+undocumented = {'ValueError': 'If `obj` was not documented by this instance or its descendants'}
 
 __arg_doc()(ArgDoc.__new__)
 __arg_doc()(ArgDoc.__call__)
 __arg_doc(raises=raises)(ArgDoc.register_argument)
 __arg_doc(raises=raises)(ArgDoc.register_keyword)
+__arg_doc(raises=raises)(ArgDoc.load_registry)
+__arg_doc()(ArgDoc.dump_registry)
+__arg_doc()(ArgDoc.document_module)
+__arg_doc()(ArgDoc.document_class)
+__arg_doc()(ArgDoc.cls)
+__arg_doc()(ArgDoc.users_of)
+__arg_doc(raises=undocumented)(ArgDoc.record)
+__arg_doc(raises=undocumented)(ArgDoc.render)
+__arg_doc()(ArgDoc.iter_documented)
+__arg_doc()(ArgDoc.render_pending)
+__arg_doc()(ArgDoc.freeze)
+
+
+def render_own_docstrings():
+    '''
+    Render the lazy docstrings of argdoc's own classes and methods (see
+    :py:meth:`.ArgDoc.render_pending`).
+    '''
+    __arg_doc.render_pending()
@@ -0,0 +1,119 @@
+'''
+Caches used by :py:class:`.ArgDoc` to avoid rendering the same text repeatedly.
+'''
+from _thread import allocate_lock
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class FragmentCache:
+    '''
+    A least-recently-used cache of rendered docstring fragments.
+
+    Fragments are stored along with the registry entry they were rendered from and are only
+    returned when looked up with that same entry, so a fragment rendered from a replaced
+    registry entry is never reused.  If `maxsize` is `None` the cache is unbounded and if it
+    is `0` nothing is cached.
+
+    The cache is shared by decorators used from several threads at once, so every operation
+    holds a lock.
+    '''
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__fragments = OrderedDict()
+        self.__lock = allocate_lock()
+
+    def get(self, key, info):
+        '''
+        Return the fragment cached under `key` for the registry entry `info` or `None`.
+        '''
+        with self.__lock:
+            entry = self.__fragments.get(key)
+            if entry is not None and entry[0] is info:
+                self.__fragments.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, key, info, fragment):
+        '''
+        Cache `fragment` under `key` for the registry entry `info`, evicting the least
+        recently used fragment if the cache is full.
+        '''
+        if self.maxsize == 0:
+            return
+        with self.__lock:
+            self.__fragments[key] = (info, fragment)
+            self.__fragments.move_to_end(key)
+            if self.maxsize is not None and len(self.__fragments) > self.maxsize:
+                self.__fragments.popitem(last=False)
+
+    def invalidate(self, name, kind):
+        '''
+        Drop all fragments rendered for the parameter `name` of the given `kind`.
+        '''
+        with self.__lock:
+            stale = [key for key in self.__fragments if key[0] == name and key[1] == kind]
+            for key in stale:
+                del self.__fragments[key]
+
+    def clear(self):
+        '''
+        Drop all fragments and reset the hit and miss counters.
+        '''
+        with self.__lock:
+            self.__fragments.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        '''
+        Return a :py:class:`.CacheInfo` describing the cache's usage.
+        '''
+        with self.__lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self.__fragments))
+
+
+class DocstringTable:
+    '''
+    A table of rendered docstrings used to share a single copy of identical docstrings
+    between decorated objects.
+
+    At most `maxsize` docstrings are kept; the oldest are dropped first, so docstrings that
+    are no longer used (e.g. those replaced when arguments are registered again) don't stay
+    alive.  A dropped docstring stays shared by the objects that already use it.  If
+    `maxsize` is `None` the table is unbounded and if it is `0` nothing is shared.
+    '''
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.__docstrings = OrderedDict()
+
+    def intern(self, doc):
+        '''
+        Return the docstring in the table that is equal to `doc`, adding `doc` if there is
+        none.
+        '''
+        docstrings = self.__docstrings
+        shared = docstrings.get(doc)
+        if shared is not None:
+            return shared
+        if self.maxsize == 0:
+            return doc
+        docstrings[doc] = doc
+        if self.maxsize is not None and len(docstrings) > self.maxsize:
+            # Drop the oldest docstring
+            docstrings.popitem(last=False)
+        return doc
+
+    def clear(self):
+        '''
+        Drop all docstrings.
+        '''
+        self.__docstrings.clear()
+
+    def __len__(self):
+        return len(self.__docstrings)
@@ -0,0 +1,600 @@
+'''
+The `argdoc` command line tool.
+
+`argdoc bake` renders the docstrings of objects decorated by :py:class:`.ArgDoc` instances
+ahead of time and writes them into the source files (or into `.pyi` stubs) so that the
+decorators, and argdoc itself, are not needed at runtime.  Source files are parsed rather
+than imported, so the arguments must be registered in registry files (see
+:py:meth:`.ArgDoc.load_registry`).  Files are processed in parallel.
+
+`argdoc check` reports every problem that would stop decorated objects from being documented
+(unregistered and misordered arguments) in one pass, without importing anything.  The results
+for unchanged files are cached, so it is fast enough to run as a pre-commit hook.
+
+`argdoc export` streams the records of decorated objects (their documented parameters and
+errors) as JSON Lines, Markdown, or HTML, one file at a time, without importing anything.
+'''
+import argparse
+import ast
+import hashlib
+import marshal
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .static import find_decorated, parse_file
+
+# Bump whenever the layout of the `argdoc check` cache file changes
+CHECK_CACHE_VERSION = 1
+
+# The ArgDoc instance used by the current (worker) process
+_arg_doc = None
+
+
+def _init_worker(form, registries, ignore_args, ignore_kws, annotations):
+    '''
+    Create the :py:class:`.ArgDoc` instance used to render docstrings in this process.  Return
+    an error message for each of the `registries` that can't be loaded.
+    '''
+    global _arg_doc
+    from .argdoc import ArgDoc
+    _arg_doc = ArgDoc(form=form, ignore_args=ignore_args, ignore_kws=ignore_kws,
+                      annotations=annotations)
+    errors = []
+    for path in registries:
+        try:
+            _arg_doc.load_registry(path, force=True)
+        except (OSError, ValueError, ImportError) as err:
+            errors.append('{}: {}'.format(path, err))
+    return errors
+
+
+def _setup(args):
+    '''
+    Create the :py:class:`.ArgDoc` instance of this process from `args` and report the registry
+    files that can't be loaded.  Return `False` if there were any.  This must be done before
+    worker processes are started, so that they only load registries that are known to load.
+    '''
+    errors = _init_worker(*_initargs(args))
+    for error in errors:
+        print(error, file=sys.stderr)
+    return not errors
+
+
+def _indented(doc, indent):
+    '''
+    Return the lines of `doc` indented by `indent` without trailing whitespace.
+    '''
+    return [(indent + line).rstrip() for line in doc.strip('\n').splitlines()]
+
+
+def _docstring_literal(doc, indent):
+    '''
+    Return the lines of a triple quoted string literal holding `doc`, indented by `indent`.
+    '''
+    doc = doc.replace('\\', '\\\\').replace("'''", "\\'\\'\\'")
+    return [indent + "'''"] + _indented(doc, indent) + [indent + "'''"]
+
+
+def _render(path, definitions):
+    '''
+    Render the docstrings of `definitions`.  Return a dictionary mapping each definition to its
+    docstring and a list of error messages.
+    '''
+    docs = {}
+    errors = []
+    for definition in definitions:
+        if definition.error is not None:
+            errors.append(_error(path, definition, definition.error))
+            continue
+        try:
+            documenter = _arg_doc(raises=definition.raises)
+            docs[definition] = documenter.render_signature(definition.signature(),
+                                                           definition.docstring)
+        except (KeyError, ValueError) as err:
+            errors.append(_error(path, definition, err))
+    return docs, errors
+
+
+def _error(path, definition, err):
+    '''
+    Return the error message for `err`, raised while documenting `definition` in `path`.
+    '''
+    return '{}:{}: {}: {}: {}'.format(path, definition.node.lineno, definition.qualname,
+                                      type(err).__name__, err)
+
+
+def _bake_source(source, docs):
+    '''
+    Return `source` with the rendered docstrings, `docs`, written into it and the decorators
+    that would have rendered them removed.
+    '''
+    lines = source.splitlines(True)
+    newline = '\r\n' if lines and lines[0].endswith('\r\n') else '\n'
+    edits = []
+    for definition, doc in docs.items():
+        node = definition.node
+        docnode = definition.docstring_node
+        first = node.body[0]
+        if first.lineno == node.lineno:
+            raise ValueError('{}: cannot add a docstring to a definition on a single line'.format(
+                definition.qualname))
+        line = lines[first.lineno - 1]
+        indent = line[:len(line) - len(line.lstrip())]
+        literal = _docstring_literal(doc, indent)
+        if docnode is None:
+            edits.append((first.lineno - 1, first.lineno - 1, literal))
+        else:
+            # Keep anything sharing a line with the original docstring (e.g. a comment)
+            head = lines[docnode.lineno - 1][:docnode.col_offset]
+            tail = lines[docnode.end_lineno - 1][docnode.end_col_offset:].rstrip('\r\n')
+            literal[0] = head + literal[0].lstrip()
+            literal[-1] += tail
+            edits.append((docnode.lineno - 1, docnode.end_lineno, literal))
+        decorator = definition.decorator
+        edits.append((decorator.lineno - 1, decorator.end_lineno, []))
+
+    # Apply the edits from the bottom up so that earlier line numbers stay valid
+    for start, end, replacement in sorted(edits, key=lambda edit: edit[0], reverse=True):
+        lines[start:end] = [line + newline for line in replacement]
+    return ''.join(lines)
+
+
+class _StubBuilder(ast.NodeTransformer):
+    '''
+    Reduce a module to the imports, assignments, classes, and function signatures that make up
+    its stub, with the rendered docstrings, `docs`, in place of the original docstrings.
+    '''
+    def __init__(self, docs):
+        self.docs = {definition.node: doc for definition, doc in docs.items()}
+        self.decorators = {definition.decorator for definition in docs}
+        self.depth = 0
+
+    def __docstring(self, node):
+        doc = self.docs.get(node) or ast.get_docstring(node)
+        if not doc:
+            return []
+        # ast.unparse adds the quotes around the docstring
+        indent = '    ' * self.depth
+        text = '\n'.join(_indented(doc, indent))
+        return [ast.Expr(ast.Constant('\n' + text + '\n' + indent))]
+
+    def __body(self, body):
+        kept = []
+        for child in body:
+            if isinstance(child, (ast.Import, ast.ImportFrom)):
+                kept.append(child)
+            elif isinstance(child, ast.Assign):
+                child.value = ast.Constant(...)
+                kept.append(child)
+            elif isinstance(child, ast.AnnAssign):
+                if child.value is not None:
+                    child.value = ast.Constant(...)
+                kept.append(child)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                kept.append(self.visit(child))
+        return kept
+
+    @staticmethod
+    def __undocumented(node):
+        if ast.get_docstring(node, clean=False) is None:
+            return node.body
+        return node.body[1:]
+
+    def visit_Module(self, node):
+        node.body = self.__docstring(node) + self.__body(self.__undocumented(node))
+        return node
+
+    def visit_ClassDef(self, node):
+        node.decorator_list = [dec for dec in node.decorator_list if dec not in self.decorators]
+        self.depth += 1
+        node.body = (self.__docstring(node) + self.__body(self.__undocumented(node))
+                     or [ast.Expr(ast.Constant(...))])
+        self.depth -= 1
+        return node
+
+    def visit_FunctionDef(self, node):
+        node.decorator_list = [dec for dec in node.decorator_list if dec not in self.decorators]
+        self.depth += 1
+        node.body = self.__docstring(node) + [ast.Expr(ast.Constant(...))]
+        self.depth -= 1
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+def bake_file(path, decorators, stubs=False, dry_run=False):
+    '''
+    Bake the docstrings of the objects in the python file at `path` that are decorated by the
+    `decorators`.  Return the path of the file that was written (or would be written), the
+    number of docstrings baked, and a list of error messages.  Nothing is written if any
+    docstring can't be rendered.
+    '''
+    try:
+        source, tree = parse_file(path)
+        definitions = list(find_decorated(tree, decorators))
+    except (SyntaxError, ValueError, UnicodeDecodeError) as err:
+        return path, 0, ['{}: {}: {}'.format(path, type(err).__name__, err)]
+    if not definitions and not stubs:
+        return path, 0, []
+
+    docs, errors = _render(path, definitions)
+    if errors:
+        return path, 0, errors
+    if stubs:
+        output = os.path.splitext(path)[0] + '.pyi'
+        baked = ast.unparse(_StubBuilder(docs).visit(tree)) + '\n'
+    else:
+        output = path
+        try:
+            baked = _bake_source(source, docs)
+        except ValueError as err:
+            return path, 0, ['{}: {}'.format(path, err)]
+    if not dry_run:
+        with open(output, 'w', encoding='utf-8', newline='') as fobj:
+            fobj.write(baked)
+    return output, len(docs), []
+
+
+def check_file(path, decorators):
+    '''
+    Check the objects in the python file at `path` that are decorated by the `decorators`.
+    Return a list of `(line, qualname, severity, message)` problems and the names of the
+    registered positional and keyword arguments that were used.
+    '''
+    try:
+        source, tree = parse_file(path)
+        # The errors that decorated objects raise don't affect any of the problems checked
+        definitions = list(find_decorated(tree, decorators, raises=False))
+    except (SyntaxError, ValueError, UnicodeDecodeError) as err:
+        return [(getattr(err, 'lineno', None) or 0, '', 'error',
+                 '{}: {}'.format(type(err).__name__, err))], [], []
+
+    documenter = _arg_doc()
+    problems = []
+    used_args = set()
+    used_kws = set()
+    for definition in definitions:
+        node = definition.node
+        sig = definition.signature()
+        for problem in documenter.check_signature(sig):
+            problems.append((node.lineno, definition.qualname, 'error', problem))
+        for param in sig.parameters.values():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            if param.default is param.empty:
+                if param.name not in documenter.ignore_args:
+                    used_args.add(param.name)
+                continue
+            if param.name in documenter.ignore_kws:
+                continue
+            used_kws.add(param.name)
+            info = documenter.keywords.get(param.name)
+            if (info is not None and info.default is not param.empty
+                    and info.default != param.default):
+                problems.append((node.lineno, definition.qualname, 'warning',
+                                 'Registered default {!r} of keyword {} shadows its default '
+                                 '{!r}'.format(info.default, param.name, param.default)))
+    return problems, sorted(used_args), sorted(used_kws)
+
+
+def _module_name(path):
+    '''
+    Return the dotted name of the module in the python file at `path`, found by walking up
+    through the packages containing it.
+    '''
+    directory, filename = os.path.split(os.path.abspath(path))
+    parts = [] if filename == '__init__.py' else [os.path.splitext(filename)[0]]
+    while os.path.isfile(os.path.join(directory, '__init__.py')):
+        directory, package = os.path.split(directory)
+        parts.insert(0, package)
+    return '.'.join(parts)
+
+
+def export_file(path, decorators):
+    '''
+    Return the qualified names and :py:class:`.DocRecord` of the objects in the python file at
+    `path` that are decorated by the `decorators`, and a list of error messages.
+    '''
+    try:
+        source, tree = parse_file(path)
+        definitions = list(find_decorated(tree, decorators))
+    except (SyntaxError, ValueError, UnicodeDecodeError) as err:
+        return [], ['{}: {}: {}'.format(path, type(err).__name__, err)]
+
+    module = _module_name(path)
+    records = []
+    errors = []
+    for definition in definitions:
+        if definition.error is not None:
+            errors.append(_error(path, definition, definition.error))
+            continue
+        try:
+            documenter = _arg_doc(raises=definition.raises)
+            records.append(('{}.{}'.format(module, definition.qualname),
+                            documenter.record_signature(definition.signature(),
+                                                        definition.docstring)))
+        except (KeyError, ValueError) as err:
+            errors.append(_error(path, definition, err))
+    return records, errors
+
+
+class _CheckCache:
+    '''
+    The results of checking files that are reused for as long as the files, the registered
+    arguments, and the options are unchanged.
+    '''
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+        self.entries = {}
+        if path is None:
+            return
+        try:
+            with open(path, 'rb') as fobj:
+                version, key, entries = marshal.loads(fobj.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if version == CHECK_CACHE_VERSION and key == self.key and isinstance(entries, dict):
+            self.entries = entries
+
+    @staticmethod
+    def stamp(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path, stamp):
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None or entry[0] != stamp:
+            return None
+        return entry[1]
+
+    def set(self, path, stamp, result):
+        self.entries[os.path.abspath(path)] = (stamp, result)
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        try:
+            with open(tmp_path, 'wb') as fobj:
+                fobj.write(marshal.dumps((CHECK_CACHE_VERSION, self.key, self.entries)))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def _registry_problems(paths):
+    '''
+    Return the problems with the registry files at `paths` (arguments registered in more than
+    one file with different types, descriptions, or defaults) and the file registering each
+    argument.
+    '''
+    from .loaders import read_registry
+    problems = []
+    origins = ({}, {})
+    for path in paths:
+        for kind, origin, specs in zip(('argument', 'keyword'), origins, read_registry(path)):
+            for name, spec in specs.items():
+                if name in origin and origin[name][1] != spec:
+                    problems.append((path, 'warning', 'Registered {} {} shadows the one in '
+                                                      '{}'.format(kind, name, origin[name][0])))
+                origin[name] = (path, spec)
+    return problems, origins
+
+
+def check(args):
+    if not _setup(args):
+        return 1
+    registry_problems, origins = _registry_problems(args.registry)
+    key = hashlib.blake2b(repr((
+        sorted((name, repr(spec)) for name, spec in _arg_doc.arguments.items()),
+        sorted((name, repr(spec)) for name, spec in _arg_doc.keywords.items()),
+        sorted(args.ignore_args), sorted(args.ignore_kws), sorted(args.decorator)
+    )).encode('utf-8'), digest_size=16).digest()
+    cache = _CheckCache(None if args.no_cache else args.cache, key)
+
+    sources = find_sources(args.paths)
+    results = {}
+    stale = []
+    for path in sources:
+        try:
+            stamp = cache.stamp(path)
+        except OSError as err:
+            results[path] = ([(0, '', 'error', str(err))], [], [])
+            continue
+        result = cache.get(path, stamp)
+        if result is None:
+            stale.append((path, stamp))
+        else:
+            results[path] = result
+    for (path, stamp), result in zip(stale, _results(args, check_file,
+                                                     [path for path, _ in stale],
+                                                     args.decorator)):
+        results[path] = result
+        cache.set(path, stamp, result)
+    cache.save()
+
+    counts = {'error': 0, 'warning': 0}
+    used_args = set()
+    used_kws = set()
+    for path in sources:
+        problems, file_args, file_kws = results[path]
+        used_args.update(file_args)
+        used_kws.update(file_kws)
+        for line, qualname, severity, message in problems:
+            counts[severity] += 1
+            print('{}:{}: {}{}: {}'.format(path, line, qualname + ': ' if qualname else '',
+                                           severity, message))
+    for path, severity, message in registry_problems:
+        counts[severity] += 1
+        print('{}: {}: {}'.format(path, severity, message))
+    if args.unused:
+        for kind, origin, used in zip(('argument', 'keyword'), origins, (used_args, used_kws)):
+            for name in sorted(origin.keys() - used):
+                counts['warning'] += 1
+                print('{}: warning: Unused {}: {}'.format(origin[name][0], kind, name))
+
+    print('Checked {} files ({} cached): {} errors, {} warnings'.format(
+        len(sources), len(sources) - len(stale), counts['error'], counts['warning']),
+        file=sys.stderr)
+    if counts['error'] or (args.strict and counts['warning']):
+        return 1
+    return 0
+
+
+def find_sources(paths):
+    '''
+    Return the python files in `paths`, searching directories recursively.
+    '''
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+                sources.extend(os.path.join(root, name) for name in sorted(files)
+                               if name.endswith('.py'))
+        else:
+            sources.append(path)
+    return sources
+
+
+def _initargs(args):
+    '''
+    Return the arguments to :py:func:`._init_worker` given by `args`.
+    '''
+    return (getattr(args, 'form', 'numpy'), args.registry, args.ignore_args, args.ignore_kws,
+            getattr(args, 'annotations', False))
+
+
+def _results(args, func, sources, *options):
+    '''
+    Yield the result of calling `func` on each of the `sources`, with the `options`, in a pool
+    of worker processes holding an :py:class:`.ArgDoc` instance set up from `args`.  The
+    instance of this process must have been set up with :py:func:`._setup` first.
+    '''
+    work = [sources] + [[option] * len(sources) for option in options]
+    if args.jobs == 1 or len(sources) < 2:
+        yield from map(func, *work)
+        return
+    with ProcessPoolExecutor(args.jobs, initializer=_init_worker,
+                             initargs=_initargs(args)) as executor:
+        yield from executor.map(func, *work, chunksize=8)
+
+
+def bake(args):
+    if not _setup(args):
+        return 1
+    sources = find_sources(args.paths)
+    status = 0
+    for output, count, errors in _results(args, bake_file, sources, args.decorator,
+                                          args.stubs, args.dry_run):
+        for error in errors:
+            print(error, file=sys.stderr)
+        if errors:
+            status = 1
+        elif count or args.stubs:
+            print('{} {} ({} docstrings)'.format('Would write' if args.dry_run else 'Wrote',
+                                                output, count))
+    return status
+
+
+def export(args):
+    from .export import export as write
+    if not _setup(args):
+        return 1
+    sources = find_sources(args.paths)
+    failed = []
+
+    def records():
+        for file_records, errors in _results(args, export_file, sources, args.decorator):
+            for error in errors:
+                print(error, file=sys.stderr)
+            failed.extend(errors)
+            yield from file_records
+
+    if args.output == '-':
+        count = write(records(), sys.stdout, args.format)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as fobj:
+            count = write(records(), fobj, args.format)
+    print('Exported {} records from {} files'.format(count, len(sources)), file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    # Not taken from the module docstring, which is stripped by python -OO
+    parser = argparse.ArgumentParser(
+        prog='argdoc', description='Bake, check, or export the docstrings of objects decorated by '
+                                   'ArgDoc instances without importing them.')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('paths', nargs='+', help='Python files or directories.')
+    common.add_argument('-r', '--registry', action='append', required=True,
+                        help='Registry file holding the registered arguments.  May be given '
+                             'more than once.')
+    common.add_argument('-d', '--decorator', action='append',
+                        help="Name of the ArgDoc instance used as a decorator (default: "
+                             "'arg_doc').  May be given more than once.")
+    common.add_argument('--ignore-args', nargs='*', default=[],
+                        help='Names of positional arguments to be ignored.')
+    common.add_argument('--ignore-kws', nargs='*', default=[],
+                        help='Names of keyword arguments to be ignored.')
+    common.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of worker processes (default: one per CPU).')
+
+    parser_bake = commands.add_parser(
+        'bake', parents=[common], help='Write rendered docstrings into source files or stubs.',
+        description='Write the rendered docstrings of decorated objects into source files, or '
+                    'into .pyi stubs, and remove the decorators that rendered them.')
+    parser_bake.add_argument('-f', '--form', default='numpy', help='Docstring format.')
+    parser_bake.add_argument('--annotations', action='store_true',
+                             help='Document the types of annotated parameters from their '
+                                  'annotations.')
+    parser_bake.add_argument('--stubs', action='store_true',
+                             help='Write .pyi stubs next to the source files instead of '
+                                  'modifying them.')
+    parser_bake.add_argument('-n', '--dry-run', action='store_true',
+                             help='Report the files that would be written without writing them.')
+    parser_bake.set_defaults(func=bake)
+
+    parser_check = commands.add_parser(
+        'check', parents=[common], help='Check that decorated objects can be documented.',
+        description='Report every unregistered or misordered argument of decorated objects, '
+                    'registered defaults that shadow the defaults of decorated objects, and '
+                    'arguments registered differently in more than one registry file.')
+    parser_check.add_argument('--unused', action='store_true',
+                              help='Also report registered arguments that are not used by any '
+                                   'of the checked objects.')
+    parser_check.add_argument('--strict', action='store_true',
+                              help='Exit with an error if there are warnings.')
+    parser_check.add_argument('--cache', default='.argdoc-check.marshal',
+                              help='File in which the results for unchanged files are cached '
+                                   '(default: %(default)s).')
+    parser_check.add_argument('--no-cache', action='store_true',
+                              help='Check every file, without reading or writing the cache.')
+    parser_check.set_defaults(func=check)
+
+    parser_export = commands.add_parser(
+        'export', parents=[common], help='Export the records of decorated objects.',
+        description='Stream the documented parameters and errors of decorated objects as JSON '
+                    'Lines, Markdown, or HTML, one file at a time.')
+    parser_export.add_argument('--format', choices=['jsonl', 'markdown', 'html'],
+                               default='jsonl', help='Output format (default: %(default)s).')
+    parser_export.add_argument('-o', '--output', default='-',
+                               help="File to write to, or '-' for standard output (default: "
+                                    "%(default)s).")
+    parser_export.add_argument('--annotations', action='store_true',
+                               help='Document the types of annotated parameters from their '
+                                    'annotations.')
+    parser_export.set_defaults(func=export)
+
+    args = parser.parse_args(argv)
+    if args.decorator is None:
+        args.decorator = ['arg_doc']
+    return args.func(args)
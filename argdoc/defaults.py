@@ -0,0 +1,135 @@
+'''
+Rendering of the default values shown in the docstrings of keyword arguments.
+'''
+from _thread import allocate_lock
+from collections import OrderedDict
+from time import perf_counter
+
+# Types that are cheap to convert to strings and aren't worth caching
+_FAST = frozenset([type(None), bool, float, complex])
+_SCALARS = frozenset([type(None), bool, int, float, complex, bytes])
+
+# The brackets around the elements of built-in containers
+_CONTAINERS = {list: ('[', ']'), tuple: ('(', ')'), set: ('{', '}'),
+               frozenset: ('frozenset({', '})'), dict: ('{', '}')}
+
+# Containers nested more deeply than this are elided, so that rendering doesn't run out of stack
+_MAX_DEPTH = 100
+
+
+class DefaultRenderer:
+    '''
+    Render default values as :py:func:`str` would, but at most `max_length` characters long.
+    Longer values are truncated and end with `...`.  If `max_length` is `None`, values are
+    rendered in full.
+
+    Built-in literals and containers are rendered piece by piece so that only the part that is
+    shown is rendered, and array-like values (e.g. numpy arrays) with more than `max_items`
+    elements are summarized by their type, shape, and dtype.  Anything else is converted with
+    :py:func:`str`.  If `time_budget` is not `None` and that takes longer than `time_budget`
+    seconds, later values of the same type are shown by their type alone, so the same values
+    may be shown differently from one run to the next.  Rendered values are cached by
+    identity, so values shared by many functions (e.g. sentinels) are rendered once.  At most
+    `cache_size` values are cached, and cached values are assumed not to change.
+    '''
+    def __init__(self, max_length=100, time_budget=None, max_items=20, cache_size=1024):
+        self.max_length = max_length
+        self.time_budget = time_budget
+        self.max_items = max_items
+        self.cache_size = cache_size
+        self.__cache = OrderedDict()
+        self.__lock = allocate_lock()
+        self.__slow_types = set()
+
+    def __call__(self, value):
+        cls = type(value)
+        if cls in _FAST or (cls is int and -2**64 < value < 2**64):
+            return str(value)
+        if cls is str:
+            return self.__truncate(value)
+
+        entry = self.__cache.get(id(value))
+        if entry is not None and entry[0] is value:
+            return entry[1]
+        text = self.__truncate(self.__render(value, str, ()))
+        if self.cache_size:
+            # Decorators share the renderer across threads, so add and evict under a lock
+            with self.__lock:
+                # Keep value alive so that its id isn't reused while it is cached
+                self.__cache[id(value)] = (value, text)
+                if len(self.__cache) > self.cache_size:
+                    # Drop the oldest entry
+                    self.__cache.popitem(last=False)
+        return text
+
+    def __truncate(self, text):
+        if self.max_length is not None and len(text) > self.max_length:
+            if self.max_length < 3:
+                # Not even the ellipsis fits
+                return '.' * self.max_length
+            return text[:self.max_length - 3] + '...'
+        return text
+
+    def __render(self, value, convert, enclosing):
+        '''
+        Render `value` with `convert` (:py:func:`str` for the value itself and :py:func:`repr`
+        for elements of containers, as :py:func:`str` does).  `enclosing` holds the ids of the
+        containers that `value` is nested in.
+        '''
+        cls = type(value)
+        if cls is str:
+            if self.max_length is not None and len(value) > self.max_length:
+                value = value[:self.max_length]
+            return convert(value)
+        if cls in _CONTAINERS and value and self.max_length is not None:
+            return self.__render_container(value, enclosing)
+        if cls in _SCALARS or cls in _CONTAINERS:
+            return self.__convert(value, convert)
+
+        size = getattr(value, 'size', None)
+        if (isinstance(size, int) and size > self.max_items and hasattr(value, 'shape')
+                and hasattr(value, 'dtype')):
+            return '<{} shape={} dtype={}>'.format(cls.__name__, tuple(value.shape), value.dtype)
+        if cls in self.__slow_types:
+            return '<{} object>'.format(cls.__qualname__)
+        start = perf_counter()
+        text = self.__convert(value, convert)
+        if self.time_budget is not None and perf_counter() - start > self.time_budget:
+            self.__slow_types.add(cls)
+        return text
+
+    def __render_container(self, value, enclosing):
+        opening, closing = _CONTAINERS[type(value)]
+        if id(value) in enclosing:
+            # A container that contains itself, shown as str shows it
+            return opening + '...' + closing
+        if len(enclosing) >= min(self.max_length, _MAX_DEPTH):
+            # Each enclosing container adds at least one character before this one, so none of
+            # it would be shown
+            return '...'
+        enclosing += (id(value),)
+        parts = []
+        length = len(opening) + len(closing)
+        items = value.items() if type(value) is dict else value
+        for item in items:
+            if type(value) is dict:
+                part = '{}: {}'.format(self.__render(item[0], repr, enclosing),
+                                       self.__render(item[1], repr, enclosing))
+            else:
+                part = self.__render(item, repr, enclosing)
+            parts.append(part)
+            length += len(part) + 2
+            if length > self.max_length:
+                parts.append('...')
+                break
+        if type(value) is tuple and len(value) == 1:
+            return '({},)'.format(parts[0])
+        return opening + ', '.join(parts) + closing
+
+    @staticmethod
+    def __convert(value, convert):
+        try:
+            return convert(value)
+        except Exception:
+            # e.g. integers too large to convert or broken __str__ methods
+            return '<{} object>'.format(type(value).__qualname__)
@@ -0,0 +1,102 @@
+'''
+A persistent cache of rendered docstrings used by :py:class:`.ArgDoc` when it is given a
+`cache_dir`.  This module is only imported when a `cache_dir` is used.
+'''
+import atexit
+import hashlib
+import marshal
+import os
+
+# Bump whenever the layout of the cache file changes
+CACHE_VERSION = 1
+
+
+class DiskCache:
+    '''
+    A cache of rendered docstrings stored in a single file in `cache_dir`.
+
+    Entries are keyed by a digest of everything that affects a rendered docstring (see
+    :py:meth:`.DiskCache.digest`) and record the qualified name of the object they were
+    rendered for.  The file is read once, on first use, and new entries are written back when
+    :py:meth:`.DiskCache.save` is called or when the interpreter exits.  The file is replaced
+    atomically, so concurrent readers always see a complete file.  Entries for objects that
+    were re-rendered because they changed are dropped when the file is rewritten.
+    '''
+    filename = 'argdoc-cache.marshal'
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, self.filename)
+        self.__entries = None
+        self.__updated = {}
+        self.__stale = set()
+        self.__used = set()
+        atexit.register(self.save)
+
+    @staticmethod
+    def digest(fingerprint):
+        '''
+        Return the key for an object whose rendered docstring depends on `fingerprint`.
+        '''
+        return hashlib.blake2b(repr(fingerprint).encode('utf-8'), digest_size=16).digest()
+
+    def __load(self):
+        try:
+            with open(self.path, 'rb') as fobj:
+                version, entries = marshal.loads(fobj.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        if version != CACHE_VERSION or not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def get(self, qualname, digest):
+        '''
+        Return the docstring cached for `qualname` under `digest` or `None` on a miss.
+        '''
+        if self.__entries is None:
+            self.__entries = self.__load()
+        entry = self.__entries.get(digest)
+        if entry is None or entry[0] != qualname:
+            # Anything cached for qualname under another digest is now stale
+            self.__stale.add(qualname)
+            return None
+        self.__used.add(digest)
+        return entry[1]
+
+    def set(self, qualname, digest, doc):
+        '''
+        Cache the docstring, `doc`, rendered for `qualname` under `digest`.
+        '''
+        if self.__entries is None:
+            self.__entries = self.__load()
+        self.__entries[digest] = self.__updated[digest] = (qualname, doc)
+
+    def save(self):
+        '''
+        Write any new entries to the cache file.  Entries written by other processes since
+        the file was read are kept, apart from stale entries for objects re-rendered here.
+        '''
+        if not self.__updated:
+            return
+        entries = {digest: entry for digest, entry in self.__load().items()
+                   if entry[0] not in self.__stale or digest in self.__used}
+        entries.update(self.__updated)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        try:
+            with open(tmp_path, 'wb') as fobj:
+                marshal.dump((CACHE_VERSION, entries), fobj)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The cache is only an optimization, so failing to write it is not an error
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self.__entries = entries
+        self.__updated.clear()
+        self.__stale.clear()
+        self.__used.clear()
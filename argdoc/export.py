@@ -0,0 +1,141 @@
+'''
+Writers that stream the records of documented objects, as yielded by
+:py:meth:`.ArgDoc.iter_documented`, to JSON Lines, Markdown, or HTML.  Each record is written
+as soon as it is received, so the records of a whole package never need to be held in memory
+at once.
+'''
+import html
+import json
+
+
+def write_jsonl(records, fobj):
+    '''
+    Write each `(name, record)` pair in `records` to `fobj` as a JSON object on its own line.
+    Return the number of records written.
+    '''
+    count = 0
+    for name, record in records:
+        entry = {'name': name}
+        entry.update(record.as_dict())
+        fobj.write(json.dumps(entry) + '\n')
+        count += 1
+    return count
+
+
+def _cell(text):
+    return str(text).replace('|', '\\|').replace('\n', ' ')
+
+
+def write_markdown(records, fobj):
+    '''
+    Write each `(name, record)` pair in `records` to `fobj` as a Markdown section with a table
+    of arguments and a table of keyword arguments.  Return the number of records written.
+    '''
+    count = 0
+    for name, record in records:
+        lines = ['## `{}`'.format(name), '']
+        if record.doc:
+            lines.extend([record.doc, ''])
+        if record.arguments or record.vargs is not None:
+            lines.extend(['**Arguments**', '', '| Name | Type | Description |',
+                          '| --- | --- | --- |'])
+            lines.extend('| `{}` | {} | {} |'.format(arg.name, _cell(arg.type), _cell(arg.desc))
+                         for arg in record.arguments)
+            if record.vargs is not None:
+                lines.append('| `*{}` | | Variable length argument list. |'.format(record.vargs))
+            lines.append('')
+        if record.keywords or record.vkeywords is not None:
+            lines.extend(['**Keyword Arguments**', '', '| Name | Type | Default | Description |',
+                          '| --- | --- | --- | --- |'])
+            lines.extend('| `{}` | {} | `{}` | {} |'.format(kw.name, _cell(kw.type),
+                                                          _cell(kw.default), _cell(kw.desc))
+                         for kw in record.keywords)
+            if record.vkeywords is not None:
+                lines.append('| `**{}` | | | Arbitrary keyword arguments. |'.format(
+                    record.vkeywords))
+            lines.append('')
+        if record.raises:
+            lines.extend(['**Raises**', ''])
+            lines.extend('- `{}`: {}'.format(ename, econd) for ename, econd in record.raises)
+            lines.append('')
+        fobj.write('\n'.join(lines) + '\n')
+        count += 1
+    return count
+
+
+_HTML_HEADER = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+<h1>{title}</h1>
+'''
+
+_HTML_FOOTER = '''</body>
+</html>
+'''
+
+
+def write_html(records, fobj, title='API Reference'):
+    '''
+    Write the `(name, record)` pairs in `records` to `fobj` as an HTML page titled `title`
+    with a section for each record.  Return the number of records written.
+    '''
+    esc = html.escape
+    fobj.write(_HTML_HEADER.format(title=esc(title)))
+    count = 0
+    for name, record in records:
+        parts = ['<section id="{0}">\n<h2><code>{0}</code></h2>\n'.format(esc(name))]
+        if record.doc:
+            parts.append('<pre>{}</pre>\n'.format(esc(record.doc)))
+        if record.arguments or record.vargs is not None:
+            parts.append('<h3>Arguments</h3>\n<table>\n'
+                         '<tr><th>Name</th><th>Type</th><th>Description</th></tr>\n')
+            parts.extend('<tr><td><code>{}</code></td><td>{}</td><td>{}</td></tr>\n'.format(
+                esc(arg.name), esc(str(arg.type)), esc(str(arg.desc))) for arg in record.arguments)
+            if record.vargs is not None:
+                parts.append('<tr><td><code>*{}</code></td><td></td>'
+                             '<td>Variable length argument list.</td></tr>\n'.format(
+                                 esc(record.vargs)))
+            parts.append('</table>\n')
+        if record.keywords or record.vkeywords is not None:
+            parts.append('<h3>Keyword Arguments</h3>\n<table>\n<tr><th>Name</th><th>Type</th>'
+                         '<th>Default</th><th>Description</th></tr>\n')
+            parts.extend('<tr><td><code>{}</code></td><td>{}</td><td><code>{}</code></td>'
+                         '<td>{}</td></tr>\n'.format(esc(kw.name), esc(str(kw.type)),
+                                                     esc(str(kw.default)), esc(str(kw.desc)))
+                         for kw in record.keywords)
+            if record.vkeywords is not None:
+                parts.append('<tr><td><code>**{}</code></td><td></td><td></td>'
+                             '<td>Arbitrary keyword arguments.</td></tr>\n'.format(
+                                 esc(record.vkeywords)))
+            parts.append('</table>\n')
+        if record.raises:
+            parts.append('<h3>Raises</h3>\n<ul>\n')
+            parts.extend('<li><code>{}</code>: {}</li>\n'.format(esc(str(ename)), esc(str(econd)))
+                         for ename, econd in record.raises)
+            parts.append('</ul>\n')
+        parts.append('</section>\n')
+        fobj.write(''.join(parts))
+        count += 1
+    fobj.write(_HTML_FOOTER)
+    return count
+
+
+# Export formats mapped to their writers
+WRITERS = {'jsonl': write_jsonl, 'markdown': write_markdown, 'html': write_html}
+
+
+def export(records, fobj, format='jsonl'):
+    '''
+    Write the `(name, record)` pairs in `records` to `fobj` in `format` (`'jsonl'`,
+    `'markdown'`, or `'html'`).  Return the number of records written.
+    '''
+    try:
+        writer = WRITERS[format]
+    except KeyError:
+        raise ValueError('Unknown export format {}, expected one of: {}'.format(
+            format, ', '.join(sorted(WRITERS))))
+    return writer(records, fobj)
@@ -0,0 +1,103 @@
+'''
+Docstring formatters used by :py:class:`.ArgDoc`.
+
+Each docstring form (e.g. "numpy" or "google") is described by a :py:class:`.Formatter`
+whose templates are compiled into bound format callables when the formatter is created.
+Custom forms can be made available to :py:class:`.ArgDoc` by registering a
+:py:class:`.Formatter` with :py:func:`.register_formatter`.
+'''
+
+FORMATTERS = {}
+
+
+class Formatter:
+    '''
+    A docstring form described by a set of :py:meth:`str.format` templates.
+
+    The `argument`, `keyword`, `vargs`, `vkeywords`, and `error` templates are formatted
+    with the fields `name`, `type`, `desc`, and `default` where they apply.  The headers are
+    inserted before the first entry of their section, the preamble is inserted once before
+    the first section, and the footer is appended to the end of every generated docstring.
+    '''
+    def __init__(self, argument, keyword, vargs, vkeywords, error, argument_header='',
+                 keyword_header='', error_header='', preamble='', footer=''):
+        self.preamble = preamble
+        self.fingerprint = (argument, keyword, vargs, vkeywords, error, argument_header,
+                            keyword_header, error_header, preamble, footer)
+        self.argument_header = argument_header
+        self.keyword_header = keyword_header
+        self.error_header = error_header
+        self.footer = footer
+
+        # Compile the templates once so rendering is just a call
+        self.argument = argument.format
+        self.keyword = keyword.format
+        self.vargs = vargs.format
+        self.vkeywords = vkeywords.format
+        self.error = error.format
+
+
+def register_formatter(name, formatter, force=False):
+    '''
+    Register a :py:class:`.Formatter` under `name` so it can be used as the `form` of an
+    :py:class:`.ArgDoc` instance.  If a formatter has already been registered under `name`,
+    a :py:class:`KeyError` will be raised unless `force` is `True`.
+    '''
+    if not force and name in FORMATTERS:
+        raise KeyError('Formatter {} already registered.'.format(name))
+    FORMATTERS[name] = formatter
+
+
+def get_formatter(form):
+    '''
+    Return the :py:class:`.Formatter` registered under `form`.  If `form` is already a
+    :py:class:`.Formatter` it is returned unchanged.
+    '''
+    if isinstance(form, Formatter):
+        return form
+    try:
+        return FORMATTERS[form]
+    except KeyError:
+        raise ValueError('Unknown docstring form {}, expected one of: {}'.format(
+            form, ', '.join(sorted(FORMATTERS))))
+
+
+register_formatter('numpy', Formatter(
+    argument='{name} : {type}\n    {desc}\n',
+    keyword='{name} : {type}, optional\n    {desc} Default: {default}\n',
+    vargs='*{name}\n    Variable length argument list.',
+    vkeywords='**{name}\n    Arbitrary keyword arguments.',
+    error='{name}\n    {desc}\n',
+    argument_header='\n\nArguments\n----------\n',
+    keyword_header='\n\nKeyword Arguments\n-----------------\n',
+    error_header='\n\nRaises\n------\n',
+    footer='    \n'))
+
+register_formatter('google', Formatter(
+    argument='    {name} ({type}): {desc}\n',
+    keyword='    {name} ({type}, optional): {desc}\n',
+    vargs='    *{name}: Variable length argument list.',
+    vkeywords='    **{name}: Arbitrary keyword arguments.',
+    error='    {name}: {desc}\n',
+    argument_header='\n\nArgs:\n',
+    keyword_header='\n\nKeywords:\n',
+    error_header='\n\nRaises:\n',
+    footer='    \n'))
+
+register_formatter('sphinx', Formatter(
+    argument=':param {name}: {desc}\n:type {name}: {type}\n',
+    keyword=':param {name}: {desc} Default: {default}\n:type {name}: {type}, optional\n',
+    vargs=':param \\*{name}: Variable length argument list.\n',
+    vkeywords=':param \\*\\*{name}: Arbitrary keyword arguments.\n',
+    error=':raises {name}: {desc}\n',
+    preamble='\n\n',
+    footer='\n'))
+
+register_formatter('epytext', Formatter(
+    argument='@param {name}: {desc}\n@type {name}: {type}\n',
+    keyword='@keyword {name}: {desc} Default: {default}\n@type {name}: {type}\n',
+    vargs='@param {name}: Variable length argument list.\n',
+    vkeywords='@keyword {name}: Arbitrary keyword arguments.\n',
+    error='@raise {name}: {desc}\n',
+    preamble='\n\n',
+    footer='\n'))
@@ -0,0 +1,119 @@
+'''
+An index of the objects decorated by an :py:class:`.ArgDoc` instance, used to render their
+docstrings again when the arguments that they use are registered again.
+'''
+from _thread import RLock
+from collections import deque
+from weakref import WeakMethod, WeakSet, ref
+
+
+class UsageIndex:
+    '''
+    A weak inverted index from parameter names to the decorated objects whose signatures
+    include them, along with what is needed to render each object's docstring again.  Objects
+    are dropped from the index when they are garbage collected.
+
+    Adding an object only records it.  The names of its parameters, found by calling
+    `parameter_names` with the decorated object, are indexed the next time the index is
+    queried, so that decorating stays cheap when nothing is ever registered again.  Every
+    decorated object is indexed, so each one is kept small: a single weak reference, which
+    is also what is queued for indexing, and usually just its original docstring.
+    '''
+    def __init__(self, parameter_names):
+        self.__parameter_names = parameter_names
+        self.__users = {}
+        # Weak references to the objects storing docstrings, mapped to their sources (see
+        # UsageIndex.add)
+        self.__sources = sources = {}
+        # The same weak references for the objects whose parameters haven't been indexed yet.
+        # A deque so that objects can be added without taking the lock
+        self.__pending = deque()
+        # Held while indexing and querying, so that no set of users changes while it is read
+        self.__lock = RLock()
+
+        def remove(key, sources=sources):
+            sources.pop(key, None)
+        self.__remove = remove
+
+    def add(self, target, obj, doc, raises):
+        '''
+        Record `obj`, whose docstring is stored on `target` and was rendered from the original
+        docstring, `doc`, and the errors, `raises`.  Raises a :py:class:`TypeError` if `target`
+        can't be weakly referenced.
+        '''
+        if obj is target and raises is None:
+            # The usual case, which only needs the docstring
+            source = doc
+        else:
+            # Bound methods are referenced weakly so that they don't keep `target` alive
+            source = (None if obj is target else WeakMethod(obj), doc, raises)
+        key = ref(target)
+        if key in self.__sources:
+            self.__sources[key] = source
+            return
+        key = ref(target, self.__remove)
+        # The source must be stored before the object is queued, since indexing skips objects
+        # without one
+        self.__sources[key] = source
+        self.__pending.append(key)
+
+    def __contains__(self, target):
+        try:
+            return ref(target) in self.__sources
+        except TypeError:
+            return False
+
+    def targets(self):
+        '''
+        Return the objects storing the docstrings of the indexed objects.
+        '''
+        targets = (key() for key in list(self.__sources))
+        return [target for target in targets if target is not None]
+
+    def __index_pending(self):
+        pending = self.__pending
+        while pending:
+            target = pending.popleft()()
+            source = None if target is None else self.source(target)
+            if source is None:
+                continue
+            for name in self.__parameter_names(source[0]):
+                users = self.__users.get(name)
+                if users is None:
+                    users = self.__users[name] = WeakSet()
+                users.add(target)
+
+    def users_of(self, name):
+        '''
+        Return the objects that use the parameter `name`.
+        '''
+        with self.__lock:
+            self.__index_pending()
+            users = self.__users.get(name)
+            return list(users) if users else []
+
+    def used(self):
+        '''
+        Return the names of the parameters used by at least one object.
+        '''
+        with self.__lock:
+            self.__index_pending()
+            return {name for name, users in self.__users.items() if users}
+
+    def source(self, target):
+        '''
+        Return the decorated object whose docstring is stored on `target`, its original
+        docstring, and its errors, or `None` if the decorated object no longer exists or was
+        never indexed.
+        '''
+        try:
+            source = self.__sources.get(ref(target))
+        except TypeError:
+            return None
+        if source is None:
+            return None
+        if type(source) is not tuple:
+            return (target, source, None)
+        method, doc, raises = source
+        obj = target if method is None else method()
+        return None if obj is None else (obj, doc, raises)
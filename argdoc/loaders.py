@@ -0,0 +1,133 @@
+'''
+Reading and writing registries of arguments for :py:meth:`.ArgDoc.load_registry` and
+:py:meth:`.ArgDoc.dump_registry`.  This module is only imported when those methods are used.
+
+A registry file contains an `arguments` table and a `keywords` table, each mapping argument
+names to a table with a `type`, a `desc`, and, for keywords, an optional `default`.  JSON and
+TOML files are always supported (TOML is read with :py:mod:`tomllib`, or with tomli, which is
+installed along with argdoc, before Python 3.11) and YAML files are supported when PyYAML is
+installed.  Writing TOML requires tomli-w.
+'''
+import marshal
+import os
+import sys
+
+from .registry import ParamSpec
+
+# Bump whenever the layout of the compiled sidecar file changes
+SIDECAR_VERSION = 2
+
+
+def _format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.json':
+        return 'json'
+    if ext == '.toml':
+        return 'toml'
+    if ext in ('.yaml', '.yml'):
+        return 'yaml'
+    raise ValueError('Unsupported registry file type {}, expected .json, .toml, .yaml, or .yml'
+                     .format(path))
+
+
+def _parse(path):
+    form = _format(path)
+    if form == 'json':
+        import json
+        with open(path, 'r') as fobj:
+            return json.load(fobj)
+    if form == 'toml':
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+        with open(path, 'rb') as fobj:
+            return tomllib.load(fobj)
+    import yaml
+    with open(path, 'r') as fobj:
+        return yaml.safe_load(fobj)
+
+
+def _normalize(data, path):
+    '''
+    Check the parsed contents of a registry file and convert each entry to a tuple of the
+    arguments to :py:class:`.ParamSpec`, which can be stored in the sidecar file.
+    '''
+    if not isinstance(data, dict):
+        raise ValueError('Registry file {} does not contain a table'.format(path))
+    tables = []
+    for section in ('arguments', 'keywords'):
+        table = {}
+        for name, info in (data.get(section) or {}).items():
+            try:
+                entry = (str(info['type']), info['desc'])
+            except (KeyError, TypeError):
+                raise ValueError('Entry {} in the {} of registry file {} must have a type and a desc'
+                                 .format(name, section, path))
+            if section == 'keywords' and info.get('default') is not None:
+                entry += (info['default'],)
+            table[name] = entry
+        tables.append(table)
+    return tuple(tables)
+
+
+def _sidecar_path(path):
+    return path + '.marshal'
+
+
+def _specs(table):
+    return {sys.intern(name): ParamSpec(*entry) for name, entry in table.items()}
+
+
+def read_registry(path):
+    '''
+    Return the `(arguments, keywords)` tables stored in the registry file at `path` as
+    dictionaries mapping names to :py:class:`.ParamSpec`.
+
+    The parsed tables are compiled into a marshal sidecar file next to `path`, which is used
+    instead of parsing `path` for as long as `path` is unchanged.
+    '''
+    stat = os.stat(path)
+    stamp = (SIDECAR_VERSION, stat.st_mtime_ns, stat.st_size)
+    sidecar = _sidecar_path(path)
+    try:
+        with open(sidecar, 'rb') as fobj:
+            cached_stamp, tables = marshal.loads(fobj.read())
+        if cached_stamp == stamp:
+            return tuple(_specs(table) for table in tables)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    tables = _normalize(_parse(path), path)
+    tmp_path = '{}.{}.tmp'.format(sidecar, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as fobj:
+            marshal.dump((stamp, tables), fobj)
+        os.replace(tmp_path, sidecar)
+    except (OSError, ValueError):
+        # The sidecar is only an optimization.  ValueError means a default can't be marshalled.
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return tuple(_specs(table) for table in tables)
+
+
+def write_registry(path, arguments, keywords):
+    '''
+    Write the `arguments` and `keywords` tables to the registry file at `path`.
+    '''
+    form = _format(path)
+    data = {'arguments': arguments, 'keywords': keywords}
+    if form == 'json':
+        import json
+        with open(path, 'w') as fobj:
+            json.dump(data, fobj, indent=2, default=str)
+    elif form == 'toml':
+        import tomli_w
+        with open(path, 'wb') as fobj:
+            tomli_w.dump(data, fobj)
+    else:
+        import yaml
+        with open(path, 'w') as fobj:
+            yaml.safe_dump(data, fobj, default_flow_style=False)
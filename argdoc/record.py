@@ -0,0 +1,105 @@
+'''
+Structured records of the parameters documented for decorated objects, from which docstrings
+can be rendered in any form, or as JSON, without parsing the docstrings.
+'''
+from collections import namedtuple
+
+from .formatters import get_formatter
+
+Argument = namedtuple('Argument', ['name', 'type', 'desc'])
+Keyword = namedtuple('Keyword', ['name', 'type', 'desc', 'default'])
+
+
+class DocRecord:
+    '''
+    Everything that the docstring of a decorated object is rendered from: its original
+    docstring (cleaned), its positional arguments and keyword arguments in order as
+    :py:class:`.Argument` and :py:class:`.Keyword` tuples, the names of its variable length
+    argument list (`vargs`) and arbitrary keyword arguments (`vkeywords`), or `None`, and the
+    errors that it raises as `(name, desc)` pairs.  Types are the documented types and
+    defaults are the default values as shown in docstrings.
+
+    Docstrings rendered by :py:meth:`.DocRecord.render` are cached for each form.
+    '''
+    __slots__ = ('doc', 'arguments', 'vargs', 'keywords', 'vkeywords', 'raises', '__rendered')
+
+    def __init__(self, doc, arguments, vargs, keywords, vkeywords, raises):
+        self.doc = doc
+        self.arguments = arguments
+        self.vargs = vargs
+        self.keywords = keywords
+        self.vkeywords = vkeywords
+        self.raises = raises
+        self.__rendered = None
+
+    def __eq__(self, other):
+        if not isinstance(other, DocRecord):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __repr__(self):
+        return 'DocRecord({})'.format(', '.join(
+            '{}={!r}'.format(name, value) for name, value in zip(self.__slots__, self.as_tuple())))
+
+    def as_tuple(self):
+        '''
+        Return the fields of the record as a tuple.
+        '''
+        return (self.doc, self.arguments, self.vargs, self.keywords, self.vkeywords, self.raises)
+
+    def as_dict(self):
+        '''
+        Return the record as a dictionary of JSON-compatible values.
+        '''
+        return {'doc': self.doc,
+                'arguments': [arg._asdict() for arg in self.arguments],
+                'vargs': self.vargs,
+                'keywords': [kw._asdict() for kw in self.keywords],
+                'vkeywords': self.vkeywords,
+                'raises': [{'name': name, 'desc': desc} for name, desc in self.raises]}
+
+    def render(self, form='numpy'):
+        '''
+        Return the docstring rendered from the record in `form`, which is the name of a
+        registered formatter, a :py:class:`.Formatter`, or `'json'` for the record as a JSON
+        object.
+        '''
+        rendered = self.__rendered
+        if rendered is None:
+            rendered = self.__rendered = {}
+        text = rendered.get(form)
+        if text is None:
+            if isinstance(form, str) and form == 'json':
+                import json
+                text = json.dumps(self.as_dict())
+            else:
+                text = self.__format(get_formatter(form))
+            text = rendered.setdefault(form, text)
+        return text
+
+    def __format(self, fmt):
+        parts = [self.doc]
+        if self.arguments or self.vargs is not None:
+            parts.append(fmt.argument_header)
+            parts.extend(fmt.argument(name=arg.name, type=arg.type, desc=arg.desc)
+                         for arg in self.arguments)
+            if self.vargs is not None:
+                parts.append(fmt.vargs(name=self.vargs))
+        if self.keywords or self.vkeywords is not None:
+            parts.append(fmt.keyword_header)
+            parts.extend(fmt.keyword(name=kw.name, type=kw.type, desc=kw.desc,
+                                     default=kw.default)
+                         for kw in self.keywords)
+            if self.vkeywords is not None:
+                parts.append(fmt.vkeywords(name=self.vkeywords))
+        if self.raises:
+            parts.append(fmt.error_header)
+            parts.extend(fmt.error(name=name, desc=desc) for name, desc in self.raises)
+
+        if len(parts) > 1:
+            parts.insert(1, fmt.preamble)
+        parts.append(fmt.footer)
+        return ''.join(parts)
@@ -0,0 +1,79 @@
+'''
+Compact storage for the arguments registered with an :py:class:`.ArgDoc` instance.
+'''
+import sys
+from collections.abc import Mapping
+from inspect import _empty
+
+
+class ParamSpec(Mapping):
+    '''
+    The type, description, and (optionally) default value registered for an argument.
+
+    A :py:class:`.ParamSpec` stores its fields in slots, which is much smaller than a
+    :py:class:`dict`, but can still be read like the dictionaries that were used previously
+    (e.g. `spec['desc']` or `spec.get('default')`).  If no default value was registered,
+    `spec.default` is :py:attr:`inspect.Parameter.empty` and `'default'` is not a key.
+    '''
+    __slots__ = ('type', 'desc', 'default')
+
+    # Type names are repeated across many arguments, so keep a single copy of each
+    __types = {}
+
+    def __init__(self, type, desc, default=_empty):
+        self.type = self.__types.setdefault(type, type)
+        self.desc = desc
+        self.default = default
+
+    def __getitem__(self, key):
+        if key == 'type':
+            return self.type
+        if key == 'desc':
+            return self.desc
+        if key == 'default' and self.default is not _empty:
+            return self.default
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield 'type'
+        yield 'desc'
+        if self.default is not _empty:
+            yield 'default'
+
+    def __len__(self):
+        return 2 if self.default is _empty else 3
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        return (ParamSpec, (self.type, self.desc, self.default))
+
+
+class Registry(dict):
+    '''
+    A read-only :py:class:`dict` mapping argument names to their :py:class:`.ParamSpec`.
+
+    Arguments must be registered through :py:meth:`.ArgDoc.register_argument`,
+    :py:meth:`.ArgDoc.register_keyword`, or :py:meth:`.ArgDoc.load_registry` so that the
+    :py:class:`.ArgDoc` instance can keep its caches consistent.  Once a registry has been
+    handed to a decorator it is never modified again; the :py:class:`.ArgDoc` instance copies
+    it before registering more arguments.
+    '''
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('Registered arguments are read-only, use ArgDoc.register_argument or '
+                        'ArgDoc.register_keyword instead')
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def _set(self, name, spec):
+        dict.__setitem__(self, sys.intern(name), spec)
+
+    def _update(self, specs):
+        dict.update(self, specs)
+
+    def __reduce__(self):
+        return (Registry, (dict(self),))
@@ -0,0 +1,144 @@
+'''
+A process-wide cache of the signatures of decorated callables.
+
+:py:func:`inspect.signature` is the most expensive step of documenting an object, and many
+callables share their signatures: closures made by the same factory, `functools.wraps`
+wrappers of the same function, :py:class:`functools.partial` objects, and bound methods.
+The signatures of functions are cached by their code objects and the identities of their
+defaults and annotations, which is everything that their signatures are built from.
+'''
+from collections import OrderedDict
+from functools import partial
+from inspect import Signature, signature as inspect_signature, unwrap
+from types import FunctionType, MethodType
+
+from .cache import CacheInfo
+
+try:
+    from inspect import _signature_bound_method, _signature_get_partial
+except ImportError:  # pragma: no cover
+    _signature_bound_method = _signature_get_partial = None
+
+# Used for callables whose signatures can't be found (e.g. some builtins), so that only their
+# docstrings are kept
+FALLBACK = Signature()
+
+
+def _stop(func):
+    return hasattr(func, '__signature__') or isinstance(func, MethodType)
+
+
+class SignatureCache:
+    '''
+    A callable that returns the same signatures as :py:func:`inspect.signature` (with
+    `follow_wrapped=True`), caching those of functions.  Wrapper chains are followed through
+    `__wrapped__` and the signatures of :py:class:`functools.partial` objects and bound
+    methods are derived from the cached signatures of their functions.  Callables that have
+    no signature (e.g. some builtins) get an empty signature instead of raising a
+    :py:class:`ValueError`, so no parameters are documented for them.
+
+    A signature is only cached the second time that it is needed, since most functions
+    have code objects of their own and keeping every signature would only add to the work
+    of the garbage collector.  At most `maxsize` signatures are cached; the oldest are
+    dropped first.  If `maxsize` is `0`, nothing is cached.  Cached signatures keep the code
+    objects, defaults, and annotations that they were built from alive, so their identities
+    can't be reused.
+    '''
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__signatures = OrderedDict()
+        # The code objects of the keys seen once, which keep their ids from being reused
+        self.__seen = OrderedDict()
+
+    def __call__(self, obj):
+        cls = type(obj)
+        if cls is FunctionType:
+            # Look for the attributes that change how inspect.signature treats a function one by
+            # one, since reading the __dict__ of a function would give every function one
+            if not (hasattr(obj, '__wrapped__') or hasattr(obj, '__signature__')
+                    or hasattr(obj, '_partialmethod') or hasattr(obj, '__partialmethod__')):
+                return self.__function_signature(obj)
+            if hasattr(obj, '__wrapped__') and not hasattr(obj, '__signature__'):
+                inner = unwrap(obj, stop=_stop)
+                if inner is not obj:
+                    return self(inner)
+        elif cls is MethodType and _signature_bound_method is not None:
+            return self.__derived(_signature_bound_method, self(obj.__func__))
+        elif cls is partial and _signature_get_partial is not None:
+            return self.__derived(_signature_get_partial, self(obj.func), obj)
+        try:
+            return inspect_signature(obj)
+        except ValueError:
+            return FALLBACK
+
+    @staticmethod
+    def __derived(derive, sig, *args):
+        '''
+        Return the signature derived by calling `derive` with the signature of the underlying
+        function, `sig`, and `args`, or `FALLBACK` if the underlying function has no signature
+        or doesn't fit (e.g. a partial object given too many arguments).
+        '''
+        if sig is FALLBACK:
+            return FALLBACK
+        try:
+            return derive(sig, *args)
+        except ValueError:
+            return FALLBACK
+
+    def __function_signature(self, func):
+        '''
+        Return the signature of the plain function `func` from the cache, inspecting it if it
+        isn't cached.
+        '''
+        defaults = func.__defaults__
+        kwdefaults = func.__kwdefaults__
+        annotations = func.__annotations__
+        key = (id(func.__code__),
+               tuple(map(id, defaults)) if defaults else None,
+               tuple((name, id(value)) for name, value in kwdefaults.items())
+               if kwdefaults else None,
+               tuple((name, id(value)) for name, value in annotations.items())
+               if annotations else None)
+        entry = self.__signatures.get(key)
+        if entry is not None and entry[0] is func.__code__:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        sig = inspect_signature(func)
+        if not self.maxsize:
+            return sig
+        if self.__seen.get(key) is not func.__code__:
+            self.__remember(self.__seen, key, func.__code__)
+        else:
+            # The signature holds the defaults and annotations, and the code is held here,
+            # so the ids in the key stay valid while the entry exists
+            self.__seen.pop(key, None)
+            self.__remember(self.__signatures, key, (func.__code__, sig))
+        return sig
+
+    def __remember(self, entries, key, value):
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            # Drop the oldest entry.  popitem is atomic, so threads can't interfere with it
+            entries.popitem(last=False)
+
+    def clear(self):
+        '''
+        Drop all cached signatures and reset the hit and miss counters.
+        '''
+        self.__signatures.clear()
+        self.__seen.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        '''
+        Return a :py:class:`.CacheInfo` describing the cache's usage.
+        '''
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.__signatures))
+
+
+# The cache shared by every ArgDoc instance in the process
+signature = SignatureCache()
@@ -0,0 +1,105 @@
+'''
+A Sphinx extension that adds the parameters of objects tagged by :py:class:`.ArgDoc`
+instances created with `sphinx_only=True` to their documentation at build time.
+
+To use it, add `'argdoc.sphinx'` to the `extensions` in the Sphinx `conf.py` along with
+`'sphinx.ext.autodoc'`.  Parameters are rendered from the arguments registered when the
+documentation is built.  Rendered parameter lists are cached in the build environment, so
+incremental builds only render the parameters of objects that changed.  The extension is
+safe to use with parallel builds (`sphinx-build -j auto`).
+'''
+import hashlib
+
+from .argdoc import documenter_for
+from .version import __version__
+
+
+def _target(app, what, obj):
+    '''
+    Return the object whose parameters belong in the documentation of `obj`.
+    '''
+    if what == 'class':
+        if documenter_for(obj) is not None:
+            return obj
+        # Otherwise the parameters are those of a tagged __init__ when autodoc includes its
+        # docstring
+        if app.config.autoclass_content in ('init', 'both'):
+            return obj.__dict__.get('__init__')
+        return None
+    # Bound methods (e.g. class methods) are tagged through their underlying function
+    return getattr(obj, '__func__', obj)
+
+
+def _init_env(app, env, *args):
+    if not hasattr(env, 'argdoc_cache'):
+        env.argdoc_cache = {}
+    if not hasattr(env, 'argdoc_purged'):
+        env.argdoc_purged = {}
+
+
+def process_docstring(app, what, name, obj, options, lines):
+    '''
+    Append the rendered parameters of `obj` to its docstring, `lines`, if `obj` was tagged.
+    '''
+    target = _target(app, what, obj)
+    documenter = documenter_for(target) if target is not None else None
+    if documenter is None:
+        return
+
+    env = app.env
+    _init_env(app, env)
+    fingerprint = documenter.fingerprint(target)
+    if fingerprint is None:
+        lines.extend(documenter.docstring(target).splitlines())
+        return
+
+    key = hashlib.blake2b(repr((name, fingerprint)).encode('utf-8'), digest_size=16).hexdigest()
+    entry = env.argdoc_cache.get(key) or env.argdoc_purged.pop(key, None)
+    if entry is None:
+        block = documenter.docstring(target).splitlines()
+    else:
+        block = entry[1]
+    env.argdoc_cache[key] = (env.docname, block)
+    lines.extend(block)
+
+
+def purge_doc(app, env, docname):
+    '''
+    Set aside the cached parameters of objects documented in `docname`, which is about to be
+    read again.  They are reused if the objects are unchanged and dropped otherwise.
+    '''
+    _init_env(app, env)
+    for key, entry in list(env.argdoc_cache.items()):
+        if entry[0] == docname:
+            env.argdoc_purged[key] = env.argdoc_cache.pop(key)
+
+
+def merge_info(app, env, docnames, other):
+    '''
+    Merge the parameters cached by a parallel reader process.
+    '''
+    _init_env(app, env)
+    for key, entry in getattr(other, 'argdoc_cache', {}).items():
+        env.argdoc_cache[key] = entry
+        env.argdoc_purged.pop(key, None)
+
+
+def drop_purged(app, env):
+    '''
+    Drop the cached parameters of objects that were not documented again.
+    '''
+    env.argdoc_purged = {}
+    return []
+
+
+def setup(app):
+    app.setup_extension('sphinx.ext.autodoc')
+    app.connect('env-before-read-docs', _init_env)
+    app.connect('autodoc-process-docstring', process_docstring)
+    app.connect('env-purge-doc', purge_doc)
+    app.connect('env-merge-info', merge_info)
+    app.connect('env-updated', drop_purged)
+    return {'version': __version__,
+            'env_version': 1,
+            'parallel_read_safe': True,
+            'parallel_write_safe': True}
@@ -0,0 +1,158 @@
+'''
+Static analysis of python source for the `argdoc` command line tools.  Decorated objects are
+found by parsing source files with :py:mod:`ast`, so nothing is imported.
+'''
+import ast
+from inspect import Parameter, Signature, _empty
+
+
+class DecoratedDefinition:
+    '''
+    A function or class definition found in a source file that is decorated by an
+    :py:class:`.ArgDoc` decorator.  If the `raises` given to the decorator isn't a literal,
+    `raises` is `None` and `error` is the :py:class:`ValueError` explaining why.
+    '''
+    def __init__(self, node, decorator, raises, qualname, error=None):
+        self.node = node
+        self.decorator = decorator
+        self.raises = raises
+        self.qualname = qualname
+        self.error = error
+
+    @property
+    def docstring(self):
+        return ast.get_docstring(self.node, clean=False) or ''
+
+    @property
+    def docstring_node(self):
+        '''
+        The expression statement holding the docstring or `None` if there isn't one.
+        '''
+        body = self.node.body
+        if (body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+                and isinstance(body[0].value.value, str)):
+            return body[0]
+        return None
+
+    def signature(self):
+        '''
+        Build an :py:class:`inspect.Signature` from the function's definition or, for a class,
+        from its `__init__` method without the first argument.  Defaults that are literals are
+        evaluated and any other default, like every annotation, is represented by its source
+        text.
+        '''
+        if isinstance(self.node, ast.ClassDef):
+            for child in self.node.body:
+                if isinstance(child, ast.FunctionDef) and child.name == '__init__':
+                    params = list(_signature(child.args).parameters.values())
+                    return Signature(params[1:])
+            return Signature()
+        return _signature(self.node.args)
+
+
+def _signature(args):
+    positional = ([(arg, Parameter.POSITIONAL_ONLY) for arg in args.posonlyargs]
+                  + [(arg, Parameter.POSITIONAL_OR_KEYWORD) for arg in args.args])
+    defaults = [_empty] * (len(positional) - len(args.defaults)) + list(args.defaults)
+
+    params = [Parameter(arg.arg, kind, default=_default(default),
+                        annotation=_annotation(arg))
+              for (arg, kind), default in zip(positional, defaults)]
+    if args.vararg is not None:
+        params.append(Parameter(args.vararg.arg, Parameter.VAR_POSITIONAL,
+                                annotation=_annotation(args.vararg)))
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        params.append(Parameter(arg.arg, Parameter.KEYWORD_ONLY,
+                                default=_empty if default is None else _default(default),
+                                annotation=_annotation(arg)))
+    if args.kwarg is not None:
+        params.append(Parameter(args.kwarg.arg, Parameter.VAR_KEYWORD,
+                                annotation=_annotation(args.kwarg)))
+    return Signature(params)
+
+
+def _annotation(arg):
+    # Annotations are kept as their source text, as they are for postponed annotations
+    if arg.annotation is None:
+        return _empty
+    if isinstance(arg.annotation, ast.Constant) and isinstance(arg.annotation.value, str):
+        return arg.annotation.value
+    return ast.unparse(arg.annotation)
+
+
+def _default(node):
+    if node is _empty:
+        return _empty
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return ast.unparse(node)
+
+
+def _match_decorator(decorator, names):
+    '''
+    Return `(True, raises)` if `decorator` is a call to one of the decorators in `names`
+    (e.g. `@arg_doc()` or `@arg_doc(raises={...})`) and `(False, None)` otherwise.  `raises`
+    is the node of the argument given as `raises` or `None`.
+    '''
+    if not isinstance(decorator, ast.Call) or ast.unparse(decorator.func) not in names:
+        return False, None
+    raises = None
+    if decorator.args:
+        raises = decorator.args[0]
+    for keyword in decorator.keywords:
+        if keyword.arg == 'raises':
+            raises = keyword.value
+    return True, raises
+
+
+def _literal_raises(node):
+    '''
+    Return the value of the `raises` argument `node`, which must be a literal.
+    '''
+    if node is None:
+        return None
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        raise ValueError('raises must be a literal dict, not {}'.format(ast.unparse(node)))
+
+
+def find_decorated(tree, names, raises=True):
+    '''
+    Yield a :py:class:`.DecoratedDefinition` for each function or class in the module `tree`
+    that is decorated by one of the decorators in `names`.  A `raises` that isn't a literal
+    only sets the `error` of its definition.  If `raises` is `False`, the `raises` given to the
+    decorators are not evaluated and are all `None`.
+    '''
+    def walk(node, prefix):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                qualname = prefix + child.name
+                for decorator in child.decorator_list:
+                    matched, node = _match_decorator(decorator, names)
+                    if matched:
+                        value = error = None
+                        try:
+                            if raises:
+                                value = _literal_raises(node)
+                        except ValueError as err:
+                            error = err
+                        yield DecoratedDefinition(child, decorator, value, qualname, error)
+                        break
+                if isinstance(child, ast.ClassDef):
+                    yield from walk(child, qualname + '.')
+                else:
+                    yield from walk(child, qualname + '.<locals>.')
+            else:
+                yield from walk(child, prefix)
+    yield from walk(tree, '')
+
+
+def parse_file(path):
+    '''
+    Return the source of the python file at `path` and its :py:mod:`ast` tree.
+    '''
+    with open(path, 'rb') as fobj:
+        source = fobj.read()
+    return source.decode('utf-8'), ast.parse(source, filename=path)
@@ -0,0 +1,70 @@
+'''
+Instrumentation for :py:class:`.ArgDoc` instances created with `instrument=True`.  This module
+is only imported when instrumentation is enabled.
+'''
+import heapq
+
+
+class Stats:
+    '''
+    Counters and timings collected while decorating objects and rendering their docstrings.
+
+    If `hook` is given, it is called with a dictionary describing each rendered docstring
+    (`qualname`, `form`, `signature_seconds`, and `render_seconds`) so that the timings can be
+    forwarded to other metrics systems.  The `nslowest` slowest objects are kept.
+    '''
+    def __init__(self, form, hook=None, nslowest=10):
+        self.form = form
+        self.hook = hook
+        self.nslowest = nslowest
+        self.decorations = 0
+        self.reused = 0
+        self.renders = 0
+        self.forms = {}
+        self.signature_seconds = 0.0
+        self.signature_max = 0.0
+        self.render_seconds = 0.0
+        self.render_max = 0.0
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.__slowest = []
+
+    def record(self, obj, signature_seconds, render_seconds):
+        '''
+        Record the time spent inspecting the signature of `obj` and rendering its docstring.
+        '''
+        qualname = '{}.{}'.format(getattr(obj, '__module__', None),
+                                  getattr(obj, '__qualname__', repr(obj)))
+        self.renders += 1
+        self.forms[self.form] = self.forms.get(self.form, 0) + 1
+        self.signature_seconds += signature_seconds
+        self.signature_max = max(self.signature_max, signature_seconds)
+        self.render_seconds += render_seconds
+        self.render_max = max(self.render_max, render_seconds)
+
+        entry = (signature_seconds + render_seconds, qualname)
+        if len(self.__slowest) < self.nslowest:
+            heapq.heappush(self.__slowest, entry)
+        else:
+            heapq.heappushpop(self.__slowest, entry)
+
+        if self.hook is not None:
+            self.hook({'qualname': qualname, 'form': self.form,
+                       'signature_seconds': signature_seconds, 'render_seconds': render_seconds})
+
+    def as_dict(self):
+        '''
+        Return the collected statistics as a dictionary.
+        '''
+        return {'decorations': self.decorations,
+                'reused': self.reused,
+                'renders': self.renders,
+                'forms': dict(self.forms),
+                'signature_seconds': self.signature_seconds,
+                'signature_max_seconds': self.signature_max,
+                'render_seconds': self.render_seconds,
+                'render_max_seconds': self.render_max,
+                'disk_cache_hits': self.disk_hits,
+                'disk_cache_misses': self.disk_misses,
+                'slowest': [{'qualname': qualname, 'seconds': seconds}
+                            for seconds, qualname in sorted(self.__slowest, reverse=True)]}
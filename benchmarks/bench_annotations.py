@@ -0,0 +1,58 @@
+'''
+Compare the time to decorate functions whose types come from their annotations with the time
+for functions whose types come from the registry, and the time to render an annotation with
+and without the cache.
+
+Run with `python benchmarks/bench_annotations.py`.
+'''
+import os
+import sys
+import timeit
+from typing import Dict, List, Optional
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from argdoc import ArgDoc  # noqa: E402
+from argdoc.annotations import _format, format_annotation  # noqa: E402
+
+NFUNCS = 2000
+ANNOTATION = Optional[Dict[str, List[int]]]
+
+
+def make_functions(annotated):
+    namespace = {'Optional': Optional, 'Dict': Dict, 'List': List}
+    params = ('data: Optional[Dict[str, List[int]]], count: Optional[int] = None' if annotated
+              else 'data, count=None')
+    exec(''.join("def func_{}({}):\n    '''Function.'''\n".format(ind, params)
+                 for ind in range(NFUNCS)), namespace)
+    return [namespace['func_{}'.format(ind)] for ind in range(NFUNCS)]
+
+
+def decorate(annotated):
+    arg_doc = ArgDoc(annotations=annotated)
+    arg_doc.register_argument('data', 'dict', 'The data.')
+    arg_doc.register_keyword('count', int, 'The count.')
+    best = None
+    for _ in range(3):
+        funcs = make_functions(annotated)
+        documenter = arg_doc()
+        start = timeit.default_timer()
+        for func in funcs:
+            documenter(func)
+        elapsed = timeit.default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / NFUNCS
+
+
+def main():
+    number = 10000
+    print('render {}: {:.2f} us uncached, {:.3f} us cached'.format(
+        ANNOTATION, min(timeit.repeat(lambda: _format(ANNOTATION), number=number)) / number * 1e6,
+        min(timeit.repeat(lambda: format_annotation(ANNOTATION), number=number)) / number * 1e6))
+    print('decorate: {:.2f} us registered types, {:.2f} us annotated types'.format(
+        decorate(False) * 1e6, decorate(True) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+'''
+Measure how much of the memory of forked worker processes stays shared with their parent,
+with and without :py:meth:`.ArgDoc.freeze`.
+
+The parent registers many arguments and decorates many functions with a lazy instance, as
+a pre-fork server would while importing its application, and then forks worker processes.
+Each worker uses every docstring (as `help` or an API docs endpoint would) and collects
+garbage, then reports its shared and private memory from `/proc/self/smaps_rollup`.  Each
+mode runs in a fresh interpreter.  Linux only.
+
+Run with `python benchmarks/bench_fork.py`; the exit status is non-zero unless freezing with
+`gc_freeze=True` leaves the workers with less private memory than not freezing.
+'''
+import argparse
+import gc
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from argdoc import ArgDoc  # noqa: E402
+
+FUNCTION_TEMPLATE = '''
+def func_{ind}(arg_{a}, arg_{b}, kw_{c}=None, kw_{d}={ind}):
+    \'\'\'
+    Function {ind}.
+    \'\'\'
+'''
+
+MODES = {'unfrozen': {}, 'frozen': {'gc_freeze': False}, 'frozen+gc': {'gc_freeze': True}}
+
+
+def memory():
+    '''
+    Return the shared and private memory of this process in kB.
+    '''
+    fields = {}
+    with open('/proc/self/smaps_rollup') as fobj:
+        for line in fobj:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return (fields['Shared_Clean'] + fields['Shared_Dirty'],
+            fields['Private_Clean'] + fields['Private_Dirty'])
+
+
+def setup(count, nparams):
+    arg_doc = ArgDoc(lazy=True)
+    for ind in range(nparams):
+        arg_doc.register_argument('arg_{}'.format(ind), 'int',
+                                  'Positional argument number {}.'.format(ind))
+        arg_doc.register_keyword('kw_{}'.format(ind), 'int',
+                                 'Keyword argument number {}.'.format(ind))
+    namespace = {}
+    exec(''.join(FUNCTION_TEMPLATE.format(ind=ind, a=ind % nparams, b=(ind + 1) % nparams,
+                                          c=(ind + 2) % nparams, d=(ind + 3) % nparams)
+                 for ind in range(count)), namespace)
+    documenter = arg_doc()
+    funcs = [documenter(namespace['func_{}'.format(ind)]) for ind in range(count)]
+    return arg_doc, funcs
+
+
+def worker(funcs, fd):
+    total = 0
+    for func in funcs:
+        total += len(str(func.__doc__))
+    gc.collect()
+    shared, private = memory()
+    os.write(fd, '{} {}\n'.format(shared, private).encode())
+
+
+def run(mode, count, nparams, nworkers):
+    '''
+    Set up, freeze according to `mode`, fork `nworkers` workers, and return the average
+    shared and private memory of the workers in kB.
+    '''
+    arg_doc, funcs = setup(count, nparams)
+    if MODES[mode]:
+        arg_doc.freeze(**MODES[mode])
+    read_fd, write_fd = os.pipe()
+    pids = []
+    for _ in range(nworkers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                worker(funcs, write_fd)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    os.close(write_fd)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    with os.fdopen(read_fd) as fobj:
+        results = [tuple(map(int, line.split())) for line in fobj]
+    shared = sum(result[0] for result in results) / len(results)
+    private = sum(result[1] for result in results) / len(results)
+    return shared, private
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--count', type=int, default=20000, help='Number of decorated functions.')
+    parser.add_argument('--params', type=int, default=500,
+                        help='Number of registered arguments and of keywords.')
+    parser.add_argument('--workers', type=int, default=4, help='Number of worker processes.')
+    parser.add_argument('--mode', choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if not os.path.exists('/proc/self/smaps_rollup') or not hasattr(os, 'fork'):
+        print('This benchmark requires Linux', file=sys.stderr)
+        return 1
+
+    if args.mode is not None:
+        print('{:.0f} {:.0f}'.format(*run(args.mode, args.count, args.params, args.workers)))
+        return 0
+    print('{:>10} {:>14} {:>14}'.format('mode', 'shared (kB)', 'private (kB)'))
+    private = {}
+    for mode in MODES:
+        output = subprocess.run([sys.executable, __file__, '--mode', mode,
+                                 '--count', str(args.count), '--params', str(args.params),
+                                 '--workers', str(args.workers)],
+                                check=True, stdout=subprocess.PIPE,
+                                universal_newlines=True).stdout
+        shared, private[mode] = map(int, output.split())
+        print('{:>10} {:>14} {:>14}'.format(mode, shared, private[mode]))
+    if private['frozen+gc'] >= private['unfrozen']:
+        print('FAILED: freezing with gc_freeze=True did not reduce the private memory of the '
+              'workers')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+'''
+Check the cost of importing argdoc against a budget.
+
+Each run imports argdoc in a fresh interpreter with `-X importtime` and reports the
+cumulative import time of the `argdoc` package.  The modules that the import adds to
+:py:data:`sys.modules` are also compared with those added by importing :py:mod:`inspect`
+and :py:mod:`weakref`, which argdoc depends on: only argdoc's own eagerly imported modules
+may be added on top of those.  Optional features (the disk cache, annotations, statistics,
+loaders, JSON, the CLI, and the Sphinx extension) must keep importing their dependencies
+when they are first used.
+
+Run with `python benchmarks/bench_import.py`; the exit status is non-zero if the budget is
+exceeded or unexpected modules are imported.
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The modules imported by `import argdoc`
+ARGDOC_MODULES = frozenset([
+    'argdoc', 'argdoc.argdoc', 'argdoc.cache', 'argdoc.defaults', 'argdoc.formatters',
+    'argdoc.index', 'argdoc.record', 'argdoc.registry', 'argdoc.signatures',
+    'argdoc.version'])
+
+NEW_MODULES = '''
+import json, sys
+before = set(sys.modules)
+import {}
+print(json.dumps(sorted(set(sys.modules) - before)))
+'''
+
+
+def new_modules(module):
+    '''
+    Return the modules added to :py:data:`sys.modules` by importing `module` in a fresh
+    interpreter.
+    '''
+    output = subprocess.run([sys.executable, '-c', NEW_MODULES.format(module)], cwd=REPO_DIR,
+                            check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return set(json.loads(output))
+
+
+def import_time():
+    '''
+    Return the cumulative time in microseconds taken to import argdoc in a fresh interpreter.
+    '''
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import argdoc'],
+                            cwd=REPO_DIR, check=True, stderr=subprocess.PIPE,
+                            universal_newlines=True).stderr
+    for line in stderr.splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == 'argdoc':
+            return int(fields[1])
+    raise RuntimeError('argdoc not found in the -X importtime output')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--budget', type=float, default=50,
+                        help='Maximum import time in milliseconds (best of --repeat runs).')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of times to import argdoc; the best time is checked.')
+    args = parser.parse_args()
+
+    best = min(import_time() for _ in range(args.repeat)) / 1000
+    print('import time: {:.1f} ms (budget {:.1f} ms)'.format(best, args.budget))
+    failed = best > args.budget
+
+    allowed = new_modules('inspect, weakref') | ARGDOC_MODULES
+    added = new_modules('argdoc')
+    print('new modules: {} ({} allowed)'.format(len(added), len(allowed)))
+    unexpected = sorted(added - allowed)
+    if unexpected:
+        print('unexpected modules: {}'.format(', '.join(unexpected)))
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+'''
+Measure the memory taken by decorated functions as their number grows.
+
+Functions are made by exec'ing generated source, so that each has its own code object and
+docstring, and are decorated by a new instance.  In the `repeated` kind every function has
+the same parameters and original docstring, as overloads and methods of sibling classes do,
+so their docstrings are shared.  In the `distinct` kind every function has different
+parameters.  The memory allocated while decorating, as reported by :py:mod:`tracemalloc`,
+and the memory taken by the distinct docstrings are divided by the number of functions.  For
+repeated parameters the docstrings take constant memory, so their share per function falls
+as the number of functions grows; the rest (the records and the weak references used to
+find the decorated objects again) grows linearly.  The arguments are then registered again
+with new descriptions to check that the table of shared docstrings doesn't keep the
+replaced docstrings alive.
+
+For repeated parameters, the memory taken by docstrings must not grow with the number of
+functions, the memory per function must fall as the number of functions grows (i.e. the
+total grows sub-linearly), and at the largest number of functions it must be at most
+`--max-bytes`.  The default bound is a little above what decorating costs when all that is
+kept for each function is its entry in the index used to render it again; keeping more for
+every function (e.g. a record of its parameters or a second weak reference) exceeds it.
+
+Run with `python benchmarks/bench_memory.py`; the exit status is non-zero if any check
+fails.
+'''
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from argdoc import ArgDoc  # noqa: E402
+
+NPARAMS = 50
+
+FUNCTION_TEMPLATE = '''
+def func_{ind}(arg_{a}, arg_{b}, kw_{c}=None, kw_{d}=None):
+    \'\'\'
+    A function.
+    \'\'\'
+'''
+
+
+def distinct(ind):
+    '''
+    Return the numbers of the parameters of function `ind`, which are different for the
+    first `NPARAMS ** 2 * (NPARAMS - 1) ** 2` functions.
+    '''
+    ind, first = divmod(ind, NPARAMS)
+    ind, second = divmod(ind, NPARAMS - 1)
+    ind, third = divmod(ind, NPARAMS)
+    fourth = ind % (NPARAMS - 1)
+    return (first, (first + 1 + second) % NPARAMS, third, (third + 1 + fourth) % NPARAMS)
+
+
+KINDS = {'repeated': lambda ind: (0, 1, 2, 3), 'distinct': distinct}
+
+
+def register(arg_doc, version, force=False):
+    for ind in range(NPARAMS):
+        arg_doc.register_argument('arg_{}'.format(ind), 'int',
+                                  'Positional argument number {} ({}).'.format(ind, version),
+                                  force=force)
+        arg_doc.register_keyword('kw_{}'.format(ind), 'int',
+                                 'Keyword argument number {} ({}).'.format(ind, version),
+                                 force=force)
+
+
+def make_functions(kind, count):
+    namespace = {}
+    exec(''.join(FUNCTION_TEMPLATE.format(ind=ind, a=a, b=b, c=c, d=d)
+                 for ind, (a, b, c, d) in ((ind, KINDS[kind](ind)) for ind in range(count))),
+         namespace)
+    return [namespace['func_{}'.format(ind)] for ind in range(count)]
+
+
+def measure(kind, count):
+    '''
+    Return the memory in bytes allocated by decorating `count` functions of `kind`, that
+    taken by their distinct docstrings, and that still allocated after registering every
+    argument again.
+    '''
+    arg_doc = ArgDoc()
+    register(arg_doc, 1)
+    funcs = make_functions(kind, count)
+    documenter = arg_doc()
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for func in funcs:
+        documenter(func)
+    gc.collect()
+    decorated = tracemalloc.get_traced_memory()[0] - start
+    docs = sum(map(sys.getsizeof, {id(func.__doc__): func.__doc__ for func in funcs}.values()))
+    register(arg_doc, 2, force=True)
+    gc.collect()
+    reregistered = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return decorated, docs, reregistered
+
+
+def check(results, max_bytes):
+    '''
+    Return descriptions of the checks that the measurements of the `repeated` kind, `results`,
+    fail.  `results` maps the numbers of functions to what :py:func:`measure` returned.
+    '''
+    failures = []
+    counts = sorted(results)
+    if results[counts[-1]][1] > results[counts[0]][1]:
+        failures.append('docstrings take {} B for {} functions but {} B for {}'.format(
+            results[counts[-1]][1], counts[-1], results[counts[0]][1], counts[0]))
+    for smaller, larger in zip(counts, counts[1:]):
+        if results[larger][0] / larger >= results[smaller][0] / smaller:
+            failures.append('{:.0f} B per function for {} functions is not less than {:.0f} B '
+                            'for {}'.format(results[larger][0] / larger, larger,
+                                            results[smaller][0] / smaller, smaller))
+    if results[counts[-1]][0] / counts[-1] > max_bytes:
+        failures.append('{:.0f} B per function for {} functions exceeds {} B'.format(
+            results[counts[-1]][0] / counts[-1], counts[-1], max_bytes))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 10000, 30000],
+                        help='Numbers of functions to decorate.')
+    parser.add_argument('--max-bytes', type=int, default=320,
+                        help='Maximum memory per function with repeated parameters at the '
+                             'largest count.')
+    args = parser.parse_args()
+
+    print('{:>10} {:>8} {:>12} {:>14} {:>14} {:>22}'.format(
+        'kind', 'count', 'total (kB)', 'per func (B)', 'docs (B/func)',
+        're-registered (B/func)'))
+    repeated = {}
+    for kind in KINDS:
+        for count in args.counts:
+            decorated, docs, reregistered = measure(kind, count)
+            if kind == 'repeated':
+                repeated[count] = (decorated, docs)
+            print('{:>10} {:>8} {:>12.0f} {:>14.0f} {:>14.1f} {:>22.0f}'.format(
+                kind, count, decorated / 1024, decorated / count, docs / count,
+                reregistered / count))
+    failures = check(repeated, args.max_bytes)
+    for failure in failures:
+        print('FAILED: {}'.format(failure))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
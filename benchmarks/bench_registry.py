@@ -0,0 +1,65 @@
+'''
+Compare the memory use and lookup cost of the argument registry against the dict-of-dicts
+layout used before :py:class:`.ParamSpec` was introduced.
+
+Run with `python benchmarks/bench_registry.py`.
+'''
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from argdoc import ArgDoc  # noqa: E402
+
+NPARAMS = 10000
+TYPES = ['str', 'int', 'float', 'bool', 'list of str']
+
+
+def build_dicts():
+    arguments = {}
+    for ind in range(NPARAMS):
+        arguments['param_{}'.format(ind)] = {'type': TYPES[ind % len(TYPES)],
+                                             'desc': 'Description of parameter {}'.format(ind)}
+    return arguments
+
+
+def build_registry():
+    arg_doc = ArgDoc()
+    for ind in range(NPARAMS):
+        arg_doc.register_argument('param_{}'.format(ind), TYPES[ind % len(TYPES)],
+                                  'Description of parameter {}'.format(ind))
+    return arg_doc.arguments
+
+
+def lookup_item(store, names):
+    for key in names:
+        store[key]['desc']
+
+
+def lookup_attribute(store, names):
+    for key in names:
+        store[key].desc
+
+
+def measure(name, build, lookups):
+    gc.collect()
+    tracemalloc.start()
+    store = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print('{}: {:.1f} KiB, {:.1f} bytes/param'.format(name, size / 1024, size / NPARAMS))
+
+    names = list(store)
+    for lookup in lookups:
+        best = min(timeit.repeat(lambda: lookup(store, names), number=10, repeat=5))
+        print('    {}: {:.1f} ns/lookup'.format(lookup.__name__, best / (10 * NPARAMS) * 1e9))
+
+
+if __name__ == '__main__':
+    print('{} registered parameters'.format(NPARAMS))
+    measure('dict of dicts', build_dicts, [lookup_item])
+    measure('ParamSpec', build_registry, [lookup_item, lookup_attribute])
@@ -0,0 +1,121 @@
+'''
+Benchmark of the shared signature cache with callables made by factories.
+
+Callables are made by factories, so that they share code objects, as plain closures,
+`functools.wraps` wrappers, and :py:class:`functools.partial` objects.  For each kind, the
+time taken by :py:func:`inspect.signature` and by the cache is reported, along with the time
+taken to decorate the callables with the cache disabled and enabled.  The docstrings rendered
+with and without the cache are compared.
+
+Run with `python benchmarks/bench_signatures.py`.
+'''
+import argparse
+import functools
+import inspect
+import os
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from argdoc import ArgDoc  # noqa: E402
+from argdoc.signatures import signature  # noqa: E402
+
+SENTINEL = object()
+
+
+def closure_factory(ind):
+    def func(arg1, arg2, kw1=None, kw2=SENTINEL, *, kw3=3):
+        '''
+        A closure.
+        '''
+        return ind
+    return func
+
+
+def wrapper_factory(ind):
+    inner = closure_factory(ind)
+
+    @functools.wraps(inner)
+    def wrapper(*args, **kwargs):
+        return inner(*args, **kwargs)
+    return wrapper
+
+
+def partial_factory(ind):
+    func = functools.partial(closure_factory(ind), ind)
+    func.__doc__ = 'A partial.'
+    return func
+
+
+FACTORIES = {'closures': closure_factory, 'wraps': wrapper_factory, 'partials': partial_factory}
+
+
+def new_instance():
+    arg_doc = ArgDoc()
+    arg_doc.register_argument('arg1', int, 'The first argument.')
+    arg_doc.register_argument('arg2', str, 'The second argument.')
+    arg_doc.register_keyword('kw1', str, 'The first keyword.')
+    arg_doc.register_keyword('kw2', object, 'The second keyword.')
+    arg_doc.register_keyword('kw3', int, 'The third keyword.')
+    return arg_doc
+
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def decorate(factory, count, cached):
+    '''
+    Decorate `count` callables made by `factory` with a new instance, with the signature
+    cache enabled or disabled.  Return the docstrings.
+    '''
+    signature.clear()
+    signature.maxsize = 4096 if cached else 0
+    arg_doc = new_instance()
+    documenter = arg_doc()
+    funcs = [factory(ind) for ind in range(count)]
+    return [documenter(func).__doc__ for func in funcs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--count', type=int, default=5000,
+                        help='Number of callables made by each factory.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of times to repeat each run; the best time is reported.')
+    args = parser.parse_args()
+
+    print('{:>10} {:>16} {:>16} {:>14} {:>14} {:>9} {:>8}'.format(
+        'kind', 'inspect (us)', 'cached (us)', 'uncached (us)', 'decorate (us)', 'speedup',
+        'same'))
+    failed = False
+    for kind, factory in FACTORIES.items():
+        funcs = [factory(ind) for ind in range(args.count)]
+        inspected, _ = best_of(args.repeat, lambda: [inspect.signature(func) for func in funcs])
+        signature.clear()
+        signature.maxsize = 4096
+        cached, _ = best_of(args.repeat, lambda: [signature(func) for func in funcs])
+        uncached_doc, uncached_docs = best_of(
+            args.repeat, lambda: decorate(factory, args.count, False))
+        cached_doc, cached_docs = best_of(
+            args.repeat, lambda: decorate(factory, args.count, True))
+        same = uncached_docs == cached_docs
+        failed = failed or not same
+        print('{:>10} {:>16.2f} {:>16.2f} {:>14.2f} {:>14.2f} {:>8.2f}x {:>8}'.format(
+            kind, inspected / args.count * 1e6, cached / args.count * 1e6,
+            uncached_doc / args.count * 1e6, cached_doc / args.count * 1e6,
+            uncached_doc / cached_doc, str(same)))
+    signature.maxsize = 4096
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+'''
+Stress test and benchmark of registering arguments and decorating functions from many
+threads at once.
+
+Each thread registers `--params` arguments of its own with a shared :py:class:`.ArgDoc`
+instance and decorates its own functions.  Meanwhile, another thread repeatedly registers an
+argument and a keyword that every function uses with `force=True`, and a third registers the
+threads' own arguments again, so that entries are dropped from the cache of rendered
+parameter entries while it is being filled.  The docstrings are then compared with those
+produced by a single thread, and the throughput is reported for each number of threads.  On
+free-threaded builds of CPython (3.13t and later), throughput should scale with the number of
+threads.
+
+Registering the shared argument or keyword again renders the docstring of every function
+decorated so far again, since they all use it.  With more threads, more functions have been
+decorated by the time of each registration, so the work grows with the number of threads
+times the number of rewrites while only decorations are counted, and decorations per second
+fall as threads are added.  Registering one of a thread's own arguments again only renders the
+functions that use it again, and registering new arguments renders nothing again.  The number
+of docstrings rendered (for decorations and registrations) and the renders per second are
+reported alongside.  Use `--rewrites 0 --reregisters 0` to measure decorating alone, which
+renders each docstring once.
+
+Run with `python benchmarks/bench_threads.py`.
+'''
+import argparse
+import os
+import sys
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from argdoc import ArgDoc  # noqa: E402
+
+FUNCTION_TEMPLATE = '''
+def func_{thread}_{ind}(arg_{thread}_{arg}, common, shared=None):
+    \'\'\'
+    Function {ind} of thread {thread}.
+    \'\'\'
+'''
+
+COMMON_DESC = 'An argument used by every thread (final).'
+FINAL_DESC = 'The shared keyword (final).'
+
+
+def make_functions(thread, count, nparams):
+    namespace = {}
+    exec(''.join(FUNCTION_TEMPLATE.format(thread=thread, ind=ind, arg=ind % nparams)
+                 for ind in range(count)), namespace)
+    return [namespace['func_{}_{}'.format(thread, ind)] for ind in range(count)]
+
+
+def register(arg_doc, thread, nparams):
+    for ind in range(nparams):
+        register_own(arg_doc, thread, ind)
+
+
+def register_own(arg_doc, thread, ind, force=False):
+    arg_doc.register_argument('arg_{}_{}'.format(thread, ind), int,
+                              'Argument {} of thread {}.'.format(ind, thread), force=force)
+
+
+def new_instance(instrument=False):
+    arg_doc = ArgDoc(instrument=instrument)
+    arg_doc.register_argument('common', str, 'An argument used by every thread.')
+    arg_doc.register_keyword('shared', str, 'The shared keyword (initial).')
+    return arg_doc
+
+
+def work(arg_doc, thread, funcs, nparams, progress, barrier):
+    barrier.wait()
+    try:
+        register(arg_doc, thread, nparams)
+        for ind, func in enumerate(funcs, 1):
+            arg_doc()(func)
+            progress[thread] = ind
+    finally:
+        # Count every function as decorated if this thread fails, so others don't wait for it
+        progress[thread] = len(funcs)
+
+
+def guarded(errors, target, *args):
+    '''
+    Call `target` with `args` and add any error that it raises to `errors`.
+    '''
+    try:
+        target(*args)
+    except BaseException as exc:
+        errors.append(exc)
+        raise
+
+
+def rewrite(arg_doc, count, progress, total, barrier):
+    '''
+    Register the shared argument and keyword again `count` times, spread evenly over the
+    `total` decorations counted in `progress`, so that they happen while threads decorate.
+    '''
+    barrier.wait()
+    for ind in range(count):
+        while sum(progress) < total * (ind + 1) // (count + 1):
+            time.sleep(0.0005)
+        arg_doc.register_argument('common', str,
+                                  'An argument used by every thread ({}).'.format(ind),
+                                  force=True)
+        arg_doc.register_keyword('shared', str, 'The shared keyword ({}).'.format(ind),
+                                 force=True)
+    arg_doc.register_argument('common', str, COMMON_DESC, force=True)
+    arg_doc.register_keyword('shared', str, FINAL_DESC, force=True)
+
+
+def reregister(arg_doc, count, nparams, progress, total, barrier):
+    '''
+    Register the arguments of the decorating threads again, unchanged, `count` times in
+    turn, spread evenly over the `total` decorations counted in `progress`.
+    '''
+    barrier.wait()
+    for ind in range(count):
+        thread = ind % len(progress)
+        # A thread has registered its arguments once it has decorated a function
+        while sum(progress) < total * (ind + 1) // (count + 1) or not progress[thread]:
+            time.sleep(0.0005)
+        register_own(arg_doc, thread, ind // len(progress) % nparams, force=True)
+
+
+def reference(nthreads, count, nparams, rewrites):
+    '''
+    Return the docstrings produced by a single thread.
+    '''
+    arg_doc = new_instance()
+    docs = {}
+    for thread in range(nthreads):
+        register(arg_doc, thread, nparams)
+        for func in make_functions(thread, count, nparams):
+            arg_doc()(func)
+            docs[func.__name__] = func
+    if rewrites:
+        arg_doc.register_argument('common', str, COMMON_DESC, force=True)
+        arg_doc.register_keyword('shared', str, FINAL_DESC, force=True)
+    return {name: func.__doc__ for name, func in docs.items()}
+
+
+def run(nthreads, count, nparams, rewrites, reregisters):
+    '''
+    Decorate `count` functions using `nparams` arguments in each of `nthreads` threads.
+    Return the time taken, the number of docstrings rendered, and whether no thread failed and
+    the docstrings match those produced by a single thread.
+    '''
+    arg_doc = new_instance(instrument=True)
+    funcs = [make_functions(thread, count, nparams) for thread in range(nthreads)]
+    progress = [0] * nthreads
+    errors = []
+    barrier = threading.Barrier(nthreads + 1 + bool(rewrites) + bool(reregisters))
+    targets = [(work, arg_doc, thread, funcs[thread], nparams, progress, barrier)
+               for thread in range(nthreads)]
+    if rewrites:
+        targets.append((rewrite, arg_doc, rewrites, progress, nthreads * count, barrier))
+    if reregisters:
+        targets.append((reregister, arg_doc, reregisters, nparams, progress, nthreads * count,
+                        barrier))
+    threads = [threading.Thread(target=guarded, args=(errors,) + target) for target in targets]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    expected = reference(nthreads, count, nparams, rewrites)
+    docs = {func.__name__: func.__doc__ for thread_funcs in funcs for func in thread_funcs}
+    return seconds, arg_doc.stats()['renders'], not errors and docs == expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Numbers of threads to run.')
+    parser.add_argument('--count', type=int, default=2000,
+                        help='Number of functions decorated by each thread.')
+    parser.add_argument('--params', type=int, default=250,
+                        help='Number of arguments registered by each thread.')
+    parser.add_argument('--rewrites', type=int, default=5,
+                        help='Number of times the shared argument and keyword are registered '
+                             'again.')
+    parser.add_argument('--reregisters', type=int, default=2000,
+                        help="Number of times one of the threads' own arguments is registered "
+                             'again.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of times to repeat each run; the best time is reported.')
+    args = parser.parse_args()
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('Python {} ({})'.format(sys.version.split()[0], 'GIL' if gil else 'free-threaded'))
+    print('{:>8} {:>12} {:>16} {:>10} {:>12} {:>14}'.format(
+        'threads', 'seconds', 'decorations/s', 'renders', 'renders/s', 'deterministic'))
+    failed = False
+    for nthreads in args.threads:
+        best = None
+        deterministic = True
+        for _ in range(args.repeat):
+            seconds, renders, matches = run(nthreads, args.count, args.params, args.rewrites,
+                                             args.reregisters)
+            if best is None or seconds < best[0]:
+                best = (seconds, renders)
+            deterministic = deterministic and matches
+        failed = failed or not deterministic
+        seconds, renders = best
+        print('{:>8} {:>12.4f} {:>16.0f} {:>10} {:>12.0f} {:>14}'.format(
+            nthreads, seconds, nthreads * args.count / seconds, renders, renders / seconds,
+            str(deterministic)))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
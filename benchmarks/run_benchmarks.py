@@ -0,0 +1,222 @@
+'''
+Benchmarks for argdoc at scale.
+
+Measures the throughput of registering arguments, the latency of decorating a function for
+each registered form, and the import time and peak memory of synthetic modules containing
+100, 1,000, and 10,000 decorated functions of varying arity, both eagerly and lazily
+rendered.  Results are written as JSON so that runs from different commits can be compared:
+
+.. code-block:: bash
+
+    python benchmarks/run_benchmarks.py --output before.json
+    # ... make changes ...
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+'''
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from argdoc import ArgDoc  # noqa: E402
+from argdoc.formatters import FORMATTERS  # noqa: E402
+
+SIZES = [100, 1000, 10000]
+NARGS = 10
+NKWS = 10
+
+MODULE_HEADER = '''\
+from argdoc import ArgDoc
+arg_doc = ArgDoc(lazy={lazy})
+for ind in range({nargs}):
+    arg_doc.register_argument('arg{{}}'.format(ind), int, 'Argument {{}}.'.format(ind))
+for ind in range({nkws}):
+    arg_doc.register_keyword('kw{{}}'.format(ind), str, 'Keyword {{}}.'.format(ind))
+'''
+
+FUNCTION_TEMPLATE = '''
+@arg_doc()
+def func_{ind}({params}):
+    \'\'\'
+    Synthetic function {ind}.
+    \'\'\'
+'''
+
+IMPORT_SCRIPT = '''\
+import json, time, tracemalloc
+trace = {trace}
+if trace:
+    tracemalloc.start()
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+current, peak = tracemalloc.get_traced_memory() if trace else (None, None)
+print(json.dumps({{'seconds': seconds, 'current_bytes': current, 'peak_bytes': peak}}))
+'''
+
+
+def params_for(ind):
+    '''
+    Return the parameter list of the `ind` th synthetic function, which has between 0 and 5
+    positional arguments and between 0 and 3 keyword arguments.
+    '''
+    args = ['arg{}'.format(num) for num in range(ind % 6)]
+    kws = ['kw{}={}'.format(num, num) for num in range(ind % 4)]
+    return ', '.join(args + kws)
+
+
+def make_function(ind):
+    namespace = {}
+    exec(FUNCTION_TEMPLATE.replace('@arg_doc()\n', '').format(ind=ind, params=params_for(ind)),
+         namespace)
+    return namespace['func_{}'.format(ind)]
+
+
+def write_module(directory, name, size, lazy):
+    source = [MODULE_HEADER.format(lazy=lazy, nargs=NARGS, nkws=NKWS)]
+    source.extend(FUNCTION_TEMPLATE.format(ind=ind, params=params_for(ind)) for ind in range(size))
+    with open(os.path.join(directory, name + '.py'), 'w') as fobj:
+        fobj.write(''.join(source))
+
+
+def run_import(directory, module, trace):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([directory, REPO_DIR, env.get('PYTHONPATH', '')])
+    output = subprocess.check_output(
+        [sys.executable, '-c', IMPORT_SCRIPT.format(module=module, trace=trace)], env=env)
+    return json.loads(output.decode('utf-8'))
+
+
+def bench_registration(repeat):
+    '''
+    Registrations per second for a fresh instance registering 1,000 arguments and 1,000
+    keywords.
+    '''
+    def register():
+        arg_doc = ArgDoc()
+        for ind in range(1000):
+            arg_doc.register_argument('arg{}'.format(ind), int, 'Argument.')
+            arg_doc.register_keyword('kw{}'.format(ind), str, 'Keyword.')
+    best = min(timeit.repeat(register, number=1, repeat=repeat))
+    return {'registrations_per_second': 2000 / best}
+
+
+def bench_decoration(repeat, count=1000):
+    '''
+    Mean time to decorate a function, per form.
+    '''
+    results = {}
+    for form in sorted(FORMATTERS):
+        arg_doc = ArgDoc(form=form)
+        for ind in range(NARGS):
+            arg_doc.register_argument('arg{}'.format(ind), int, 'Argument.')
+        for ind in range(NKWS):
+            arg_doc.register_keyword('kw{}'.format(ind), str, 'Keyword.')
+        best = None
+        for _ in range(repeat):
+            funcs = [make_function(ind) for ind in range(count)]
+            documenter = arg_doc()
+            start = time.perf_counter()
+            for func in funcs:
+                documenter(func)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[form] = {'seconds_per_call': best / count}
+    return results
+
+
+def bench_imports(repeat, sizes):
+    '''
+    Import time and the traced memory (retained after the import and peak) of synthetic
+    modules.
+    '''
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        results['argdoc'] = {'seconds': min(run_import(directory, 'argdoc', False)['seconds']
+                                            for _ in range(repeat))}
+        for size in sizes:
+            for lazy in (False, True):
+                name = 'synthetic_{}_{}'.format(size, 'lazy' if lazy else 'eager')
+                write_module(directory, name, size, lazy)
+                # Import once to write the bytecode cache so compiling isn't measured
+                run_import(directory, name, False)
+                seconds = min(run_import(directory, name, False)['seconds'] for _ in range(repeat))
+                memory = run_import(directory, name, True)
+                results[name] = {'seconds': seconds, 'current_bytes': memory['current_bytes'],
+                                 'peak_bytes': memory['peak_bytes']}
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR,
+                                       stderr=subprocess.DEVNULL).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + key + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(baseline, results):
+    '''
+    Print the ratio of each measurement to the same measurement in `baseline`.
+    '''
+    old = flatten(baseline['results'])
+    new = flatten(results['results'])
+    print('{:<55} {:>14} {:>14} {:>8}'.format('measurement', 'baseline', 'current', 'ratio'))
+    for key in sorted(new):
+        if key in old and old[key]:
+            print('{:<55} {:>14.6g} {:>14.6g} {:>8.2f}'.format(key, old[key], new[key],
+                                                              new[key] / old[key]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='Compare the results to a previous JSON results file.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of times to repeat each measurement; the best is reported.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='Numbers of functions in the synthetic modules.')
+    args = parser.parse_args()
+
+    results = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': {
+            'registration': bench_registration(args.repeat),
+            'decoration': bench_decoration(args.repeat),
+            'imports': bench_imports(args.repeat, args.sizes),
+        },
+    }
+
+    if args.output:
+        with open(args.output, 'w') as fobj:
+            json.dump(results, fobj, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.compare:
+        with open(args.compare) as fobj:
+            compare(json.load(fobj), results)
+
+
+if __name__ == '__main__':
+    main()
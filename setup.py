@@ -34,15 +34,18 @@ setup(name=name,
       description='A package for reducing copy/paste of argument descriptions in docstrings',
       long_description=long_description,
       long_description_content_type="text/markdown",
-      setup_requires=['sphinx'],
-      install_requires=['future', 'sphinx', 'sphinxcontrib-programoutput'],
+      python_requires='>=3.9',
+      # tomllib, which reads TOML registry files, was added to the standard library in 3.11
+      install_requires=['tomli; python_version < "3.11"'],
+      extras_require={'docs': ['sphinx', 'sphinxcontrib-programoutput']},
       packages=['argdoc'],
+      entry_points={'console_scripts': ['argdoc = argdoc.cli:main']},
       cmdclass=cmdclass,
       command_options=command_options,
       url='https://github.com/jsolbrig/argdoc',
       classifiers=[
-          'Programming Language :: Python :: 2.7',
-          'Programming Language :: Python :: 3.7',
+          'Programming Language :: Python :: 3',
+          'Programming Language :: Python :: 3 :: Only',
           'License :: OSI Approved :: MIT License',
           'Operating System :: OS Independent']
      )